@@ -0,0 +1,309 @@
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from cli import argument, percentile
+from simulation import ACTION_SPAWN, ACTION_UNLOCK_AND_SPAWN, Progression, Simulation
+from world import load_world
+
+# Balance sweep: many headless games per parameter set, each played by the scripted
+# Pusher below, on every core. Every finished run is appended to a JSON lines file as
+# soon as it comes back, so a sweep can be stopped at any point and picked up again.
+RUNS = 20               # Seeds per parameter set
+TIME_LIMIT = 60 * 60    # Game seconds before a run gives up
+MILESTONES = ('50', '80', '120', '150')  # Unlocks, by boulder size; 150 shows the congratulations screen
+PERCENTILES = (10, 50, 90)
+
+# Default sweep. Each set overrides Simulation attributes: boulder_rewards, unlock_costs,
+# xp_requirements, default_xp_requirement and the base_/per_level strength and jump force.
+PARAMETER_SETS = {
+    'default': {},
+    'strong_start': {'base_strength': 200},
+    'strong_start_steep_levels': {'base_strength': 300, 'strength_per_level': 60},
+    'strong_start_steep_levels_cheap_unlocks': {'base_strength': 300, 'strength_per_level': 60,
+                                                'unlock_costs': {50: 5, 80: 25, 120: 100, 150: 500}},
+    'strong_start_steeper_levels': {'base_strength': 300, 'strength_per_level': 150},
+}
+
+
+def apply_params(sim, params):
+    # Start from a fresh save under the given economy; JSON files carry the sizes and levels as string keys
+    for name in ('boulder_rewards', 'unlock_costs', 'xp_requirements'):
+        if name in params:
+            setattr(sim, name, {int(key): tuple(value) if isinstance(value, list) else value
+                                for key, value in params[name].items()})
+    for name in ('base_strength', 'strength_per_level', 'base_jump_force', 'jump_force_per_level'):
+        if name in params:
+            setattr(sim, name, params[name])
+    default_requirement = params.get('default_xp_requirement', sim.progression.default_requirement)
+    sim.progression = Progression(sim.xp_requirements, default_requirement, on_level_up=sim.level_up)
+    sim.apply_level_bonus()
+
+
+def params_key(params):
+    # Identifies a parameter set by content, so renaming a set doesn't rerun it
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class Pusher:
+    """A simple scripted player: fetch a boulder, push it over a hill, give way when it rolls back.
+
+    It always buys the cheapest locked boulder as soon as it can afford it, then pushes
+    the biggest size that last made it over a hill, dropping a size after a failed
+    attempt. A boulder too heavy to push over in one go gets pumped: back off while it
+    rolls back down, then meet it again with a run-up as it turns, so every swing climbs
+    higher. That takes a slope behind as well as ahead, so once even the smallest size
+    won't go it moves on to the next approach: every valley pushing right, then every
+    valley with a hill behind it pushing left. The back-off length and pauses come from
+    the run's seed, which is what spreads the runs of one parameter set into a distribution.
+    """
+
+    def __init__(self, sim, rng, patience=20, give_up=600, run_up=100):
+        self.sim = sim
+        self.rng = rng
+        self.patience = patience  # Ticks stalled against the boulder before backing off
+        self.give_up = give_up    # Ticks without getting the boulder further before fetching a new one
+        self.run_up = run_up      # Gap kept to a boulder rolling back, to build up speed before meeting it
+        self.sizes = sorted(sim.unlocked_sizes)
+        self.size = self.sizes[0]
+        self.mode = 'fetch'
+        self.timer = 0
+        self.stalled = 0
+        self.best = 0
+        self.since_best = 0
+        self.attempt_passes = 0
+
+        # (where the boulder drops, push direction) for every valley: right at the hill ahead,
+        # then left at the hill behind for all but the first
+        spawns = [position for before_x, position in sim.world.spawn_points]
+        self.approaches = [(position, 1) for position in spawns[:-1]] + [(position, -1) for position in spawns[1:]]
+        self.approach = 0
+
+    @property
+    def direction(self):
+        return self.approaches[self.approach][1]
+
+    def keys(self, towards):
+        # (left, right) held to walk towards the hill being pushed at (1) or away from it (-1)
+        return towards * self.direction < 0, towards * self.direction > 0
+
+    def next_unlock(self):
+        # Cheapest size still locked, or None once everything is
+        for size in self.sizes:
+            if not self.sim.unlocked_sizes[size]:
+                return size
+        return None
+
+    def fetch_target(self):
+        # Behind where the boulder drops, clear of the biggest size the next spawn could be
+        size = self.next_unlock()
+        if size is None or self.sim.money < self.sim.unlock_costs[size]:
+            size = self.size
+        position, direction = self.approaches[self.approach]
+        return position[0] - direction * (size + 50)
+
+    def next_action(self):
+        size = self.next_unlock()
+        if size is not None and self.sim.money >= self.sim.unlock_costs[size]:
+            self.size = size
+            return ACTION_UNLOCK_AND_SPAWN
+        return ACTION_SPAWN
+
+    def end_attempt(self):
+        # Step up a size after a boulder made it over, down one after it didn't,
+        # and on to the next approach once even the smallest one won't go
+        i = self.sizes.index(self.size)
+        if self.sim.hill_passes > self.attempt_passes:
+            if i + 1 < len(self.sizes) and self.sim.unlocked_sizes[self.sizes[i + 1]]:
+                i += 1
+        elif i > 0:
+            i -= 1
+        else:
+            self.approach = (self.approach + 1) % len(self.approaches)
+        self.size = self.sizes[i]
+        self.mode = 'fetch'
+
+    def step(self):
+        """Returns (left, right, jump, action); action is None or an ACTION_* to perform with self.size."""
+        sim = self.sim
+        x = sim.sisyphus.position.x
+
+        if self.mode == 'fetch':
+            distance = x - self.fetch_target()
+            if abs(distance) > 30:
+                climbing = abs(distance) > 150  # Hop up slopes too steep to walk, and over a boulder left in the way
+                return distance > 0, distance < 0, climbing, None
+            if sim.spawn_cooldown or abs(sim.sisyphus.velocity.x) > 20:  # Come to a stop first
+                return False, False, False, None
+            self.mode = 'wait'
+            self.timer = 60 + self.rng.randrange(60)  # Let it land, plus a human pause
+            self.stalled = self.since_best = 0
+            self.best = float('-inf')
+            self.attempt_passes = sim.hill_passes
+            return False, False, False, self.next_action()
+
+        if self.mode == 'wait':
+            self.timer -= 1
+            if self.timer <= 0:
+                self.mode = 'push'
+            return False, False, False, None
+
+        boulder = sim.current_boulder
+        body, radius = boulder['body'], boulder['shape'].radius
+        ahead = (body.position.x - x) * self.direction  # How far in front of us it is
+        self.since_best += 1
+        if body.position.x * self.direction > self.best + 5:
+            self.best = body.position.x * self.direction
+            self.since_best = 0
+        # Over the top, rolled back past us, or no headway for a while: start over
+        if sim.hill_passes > self.attempt_passes or ahead < -radius or self.since_best > self.give_up:
+            self.end_attempt()
+            return False, False, False, None
+
+        if self.mode == 'back':
+            self.timer -= 1
+            if self.timer <= 0:
+                self.mode = 'push'
+            return (*self.keys(-1), False, None)
+
+        # Rolling back down at us: give way far enough for a run-up, then push again as it turns
+        if body.velocity.x * self.direction < 0:
+            self.stalled = 0
+            if ahead < radius + self.run_up:
+                return (*self.keys(-1), False, None)
+            return False, False, False, None
+
+        if abs(sim.sisyphus.velocity.x) < 5 and abs(body.velocity.x) < 5:
+            self.stalled += 1
+            if self.stalled > self.patience:
+                self.stalled = 0
+                self.mode = 'back'
+                self.timer = self.rng.randint(10, 40)
+        else:
+            self.stalled = 0
+        return (*self.keys(1), False, None)
+
+
+class BalanceSimulation(Simulation):
+    """A fresh game under one parameter set that notes the tick of every unlock."""
+
+    def __init__(self, params, world=None):
+        super().__init__({}, world)
+        apply_params(self, params)
+        # The first boulder dropped with the default reward and XP; drop it again under these
+        self.spawn_cooldown = 0
+        self.spawn_boulder(40)
+        self.ticks = 0
+        self.milestones = {}
+
+    def on_unlock(self, size):
+        self.milestones[str(size)] = self.ticks * self.dt
+
+
+def run_game(task):
+    """One seeded run; returns the result row written to the output file."""
+    name, params, seed, time_limit, world_path = task
+    random.seed(seed)
+    sim = BalanceSimulation(params, load_world(world_path) if world_path else None)
+    pusher = Pusher(sim, random.Random(seed))
+    limit = int(time_limit / sim.dt)
+    start = time.perf_counter()
+    while sim.ticks < limit and MILESTONES[-1] not in sim.milestones:
+        left, right, jump, action = pusher.step()
+        if action is not None:
+            sim.perform(action, pusher.size)
+        sim.tick(left, right, jump)
+        sim.ticks += 1
+    return {
+        'set': name,
+        'params': params_key(params),
+        'seed': seed,
+        'milestones': {milestone: sim.milestones.get(milestone) for milestone in MILESTONES},
+        'game_seconds': sim.ticks * sim.dt,
+        'hill_passes': sim.hill_passes,
+        'level': sim.calculate_strength_level(),
+        'money': sim.money,
+        'wall_seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def load_results(path):
+    # Rows already on disk; a line cut short by an interrupted sweep is dropped and rerun
+    results = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    pass
+    return results
+
+
+def sweep(parameter_sets, path, runs=RUNS, time_limit=TIME_LIMIT, world_path=None, processes=None):
+    """Runs every (parameter set, seed) not yet in the output file; returns all rows."""
+    results = load_results(path)
+    done = {(row['params'], row['seed']) for row in results}
+    tasks = [(name, params, seed, time_limit, world_path)
+             for name, params in parameter_sets.items()
+             for seed in range(runs)
+             if (params_key(params), seed) not in done]
+    print(f"{len(done)} runs on file, {len(tasks)} to go on {processes or os.cpu_count()} processes")
+    if not tasks:
+        return results
+
+    # Rewrite what was read so a truncated last line doesn't glue onto the next row
+    with open(path, 'w') as f:
+        for row in results:
+            f.write(json.dumps(row) + '\n')
+    with open(path, 'a') as f, Pool(processes) as pool:
+        for i, row in enumerate(pool.imap_unordered(run_game, tasks), 1):
+            f.write(json.dumps(row) + '\n')
+            f.flush()
+            results.append(row)
+            reached = sum(time is not None for time in row['milestones'].values())
+            print(f"[{i}/{len(tasks)}] {row['set']} seed {row['seed']}: {reached}/{len(MILESTONES)} unlocks in {row['wall_seconds']:.1f}s")
+    return results
+
+
+def report(results, parameter_sets):
+    # Minutes to each unlock per parameter set, over the runs that got there
+    width = max(len(name) for name in parameter_sets) + 2
+    print(f"{'set':<{width}} {'unlock':>8} {'reached':>8}" + ''.join(f"{f'p{p}':>8}" for p in PERCENTILES))
+    for name, params in parameter_sets.items():
+        key = params_key(params)
+        rows = [row for row in results if row['params'] == key]
+        for milestone in MILESTONES:
+            times = [row['milestones'][milestone] / 60 for row in rows if row['milestones'][milestone] is not None]
+            label = 'congrats' if milestone == MILESTONES[-1] else milestone
+            line = f"{name:<{width}} {label:>8} {len(times):>4}/{len(rows):<3}"
+            if times:
+                line += ''.join(f"{percentile(times, p):8.1f}" for p in PERCENTILES)
+            print(line)
+
+
+if __name__ == "__main__":
+    # python balance.py [--sets sets.json] [--out balance.jsonl] [--runs N] [--minutes M] [--processes P] [--world path]
+    # Rerunning with the same output file resumes the sweep; --report only prints what is on file.
+    sets_path = argument('--sets', None)
+    if sets_path:
+        with open(sets_path, 'r') as f:
+            parameter_sets = json.load(f)
+    else:
+        parameter_sets = PARAMETER_SETS
+    out = argument('--out', 'balance.jsonl')
+    if '--report' in sys.argv:
+        results = load_results(out)
+    else:
+        processes = argument('--processes', None)
+        try:
+            results = sweep(parameter_sets, out, int(argument('--runs', RUNS)), float(argument('--minutes', TIME_LIMIT / 60)) * 60,
+                            argument('--world', None), int(processes) if processes else None)
+        except KeyboardInterrupt:
+            print(f"\nStopped; rerun with --out {out} to resume")
+            sys.exit(1)
+    report(results, parameter_sets)
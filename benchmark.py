@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import math
+import platform
+import tempfile
+import time
+
+# Runs without a window or sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import pymunk
+
+from cli import argument, percentile
+from simulation import ACTION_SPAWN, Simulation
+from world import World, DEFAULT_WORLD
+
+SEED = 1234
+WARMUP_FRAMES = 30  # Not measured: first blits of each sprite size and rotation fill the caches
+BOULDER_SIZES = (40, 50, 80, 120, 150)
+PERCENTILES = (50, 95, 99)
+PHASES = ('sim', 'render', 'frame')
+
+
+def wide_world(columns, spacing=84):
+    # The default world stretched to the right with flat ground, wide enough for the pile
+    with open(DEFAULT_WORLD, 'r') as f:
+        data = json.load(f)
+    width = max(data['width'], (columns + 2) * spacing)
+    for zone in data['zones']:
+        x, y, w, h = zone['rect']
+        if x + w == data['width']:  # Stretch the last valley to the new edge
+            zone['rect'] = [x, y, width - x, h]
+    data['width'] = width
+    return World(data, f"{DEFAULT_WORLD} (width {width})")
+
+
+def pile_world(count, radius=40):
+    # The default world widened with flat ground until spawn_boulder_pile has a free slot per boulder
+    spacing = 2 * radius + 4
+    columns = 0
+    while True:
+        world = wide_world(columns, spacing)
+        slots = Simulation(world=world).pile_slots(radius)
+        if len(slots) >= count:
+            return world
+        # Past the hills every column is flat, so the last one shows how many rows are free
+        rows = sum(1 for x, _ in slots if x == slots[-1][0])
+        columns = int((world.width - spacing) // spacing) + math.ceil((count - len(slots)) / rows)
+
+
+def benchmark_game(save_dir, world=None):
+    # A seeded game on a throwaway save, so benchmarks neither read nor write the player's progress
+    from main import Game, get_ticks
+
+    game = Game(world=world, save_file=os.path.join(save_dir, 'save_data.json'))
+    game.save_progress = lambda: None  # Keep autosaves out of the timings
+    game.seed(SEED)
+    game.start_time = get_ticks()
+    return game
+
+
+def benchmark_boulders(counts, warmup_ticks=120, ticks=120, frames=60, spatial_hash=True):
+    """Step and frame time as the number of boulders grows, in one wide world."""
+    with tempfile.TemporaryDirectory() as save_dir:
+        game = benchmark_game(save_dir, pile_world(max(counts)))
+        results = []
+        for count in counts:
+            game.clear_boulders()
+            game.spawn_boulder_pile(count, spatial_hash=spatial_hash)
+            for _ in range(warmup_ticks):  # Let the pile fall and settle
+                game.tick()
+
+            start = time.perf_counter()
+            for _ in range(ticks):
+                game.tick()
+            step_ms = (time.perf_counter() - start) / ticks * 1000
+
+            start = time.perf_counter()
+            for _ in range(frames):
+                game.draw_frame(game.dt, 0.5)
+            frame_ms = (time.perf_counter() - start) / frames * 1000
+
+            # Frame cost follows the boulders on screen, not the total
+            on_screen = len(game.visible_shapes)
+            results.append((count, step_ms, frame_ms, on_screen))
+            print(f"{count:6d} boulders  step {step_ms:7.3f} ms  frame {frame_ms:7.3f} ms  ({on_screen} on screen)")
+        game.save_writer.close()
+    return results
+
+
+def hold(left=False, right=False, jump=False):
+    return lambda frame: (left, right, jump)
+
+
+def idle_on_hill_1(game):
+    # The starting position in front of hill 1, nothing pressed
+    return hold()
+
+
+def push_boulder(game, size):
+    # Every size pushed from the first valley over both hills. A naive bot can't get the
+    # heavy boulders over, so the boulder gets a steady shove scaled by its mass.
+    game.unlocked_sizes = dict.fromkeys(game.unlocked_sizes, True)
+    game.sisyphus.position = (200, 555)
+    game.space.reindex_shapes_for_body(game.sisyphus)
+    game.spawn_cooldown = 0
+    game.perform(ACTION_SPAWN, size)
+
+    def controls(frame):
+        boulder = game.current_boulder['body']
+        if frame > 60:  # Let it land first
+            boulder.apply_impulse_at_world_point((boulder.mass * 6, 0), boulder.position)
+        return False, True, game.sisyphus.position.x > boulder.position.x - size
+    return controls
+
+
+def level_up_burst(game):
+    # The 200-particle level up burst, once a second
+    def controls(frame):
+        if frame % 60 == 0:
+            game.create_level_up_particles()
+        return False, False, False
+    return controls
+
+
+def congratulations(game):
+    # The overlay over the paused game, with 500 particles every two seconds
+    def controls(frame):
+        if frame % 120 == 0:
+            game.show_congratulations()
+        return False, False, False
+    return controls
+
+
+def camera_sweep(game):
+    # Pan from one end of the world to the other and back, ignoring Sisyphus
+    game.update_camera = lambda frame_time: None
+    frames = 400
+    span = game.width - 800
+
+    def controls(frame):
+        phase = (frame % frames) / (frames / 2)
+        game.camera_x = span * (phase if phase <= 1 else 2 - phase)
+        return False, False, False
+    return controls
+
+
+# name -> (measured frames, setup returning the per-frame controls)
+SCENARIOS = {
+    'idle_hill_1': (600, idle_on_hill_1),
+    **{f'push_{size}': (600, lambda game, size=size: push_boulder(game, size)) for size in BOULDER_SIZES},
+    'level_up_burst': (300, level_up_burst),
+    'congratulations': (300, congratulations),
+    'camera_sweep': (400, camera_sweep),
+}
+
+
+def run_scenario(game, frames, setup):
+    """Drive the game's own update and render at one tick per frame; per-frame ms by phase."""
+    controls = setup(game)
+    samples = {phase: [] for phase in PHASES}
+    for frame in range(WARMUP_FRAMES + frames):
+        left, right, jump = controls(frame)
+        start = time.perf_counter()
+        game.handle_events()
+        game.update(left, right, jump)
+        simulated = time.perf_counter()
+        game.render(game.dt, 0.5)
+        end = time.perf_counter()
+        if frame >= WARMUP_FRAMES:
+            samples['sim'].append((simulated - start) * 1000)
+            samples['render'].append((end - simulated) * 1000)
+            samples['frame'].append((end - start) * 1000)
+    return {phase: {f'p{p}': round(percentile(values, p), 4) for p in PERCENTILES}
+            for phase, values in samples.items()}
+
+
+def benchmark_suite(names=None):
+    """Run the scenarios, each in a fresh seeded game, and return the JSON-ready report."""
+    report = {
+        'seed': SEED,
+        'warmup_frames': WARMUP_FRAMES,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'pymunk': pymunk.version,
+        'scenarios': {},
+    }
+    print(f"{'scenario':<18}" + "".join(f"{phase + ' p' + str(p):>14}" for phase in PHASES for p in PERCENTILES))
+    with tempfile.TemporaryDirectory() as save_dir:
+        for name in names or SCENARIOS:
+            frames, setup = SCENARIOS[name]
+            game = benchmark_game(save_dir)
+            result = run_scenario(game, frames, setup)
+            result['frames'] = frames
+            result['hill_passes'] = game.hill_passes
+            game.save_writer.close()
+            report['scenarios'][name] = result
+            print(f"{name:<18}" + "".join(f"{result[phase][f'p{p}']:14.3f}" for phase in PHASES for p in PERCENTILES))
+    return report
+
+
+def compare(report, baseline, tolerance=0.25, floor_ms=0.1):
+    """Print the changes against a baseline report; returns the regressions found.
+
+    A percentile regresses when it is both `tolerance` slower relatively and `floor_ms`
+    slower absolutely, so sub-millisecond jitter on cheap phases isn't flagged.
+    """
+    regressions = []
+    for name, result in report['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            print(f"{name}: not in the baseline")
+            continue
+        for phase in PHASES:
+            for p in PERCENTILES:
+                key = f'p{p}'
+                now, before = result[phase][key], base[phase][key]
+                if now > before * (1 + tolerance) and now - before > floor_ms:
+                    regressions.append((name, phase, key, before, now))
+    for name, phase, key, before, now in regressions:
+        print(f"REGRESSION {name} {phase} {key}: {before:.3f} ms -> {now:.3f} ms ({now / before - 1:+.0%})")
+    if not regressions:
+        print(f"No regressions against the baseline (tolerance {tolerance:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['boulders']:
+        # python benchmark.py boulders [count ...] [--no-hash]
+        spatial_hash = '--no-hash' not in sys.argv
+        counts = [int(arg) for arg in sys.argv[2:] if arg.isdigit()] or [100, 250, 500, 1000, 2000]
+        print(f"Broadphase: {'spatial hash' if spatial_hash else 'bounding box tree'}")
+        benchmark_boulders(counts, spatial_hash=spatial_hash)
+        sys.exit(0)
+
+    # python benchmark.py [scenario ...] [--json out.json] [--baseline base.json] [--tolerance 0.25]
+    values = {argument(flag) for flag in ('--json', '--baseline', '--tolerance')}
+    names = [arg for arg in sys.argv[1:] if not arg.startswith('--') and arg not in values]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenario {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+        sys.exit(2)
+
+    report = benchmark_suite(names)
+    if argument('--json'):
+        with open(argument('--json'), 'w') as f:
+            json.dump(report, f, indent=2)
+    if argument('--baseline'):
+        with open(argument('--baseline'), 'r') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, float(argument('--tolerance', 0.25))):
+            sys.exit(1)
@@ -0,0 +1,155 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+from world import DEFAULT_WORLD, load_world
+
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'assets')
+BUNDLE_PATH = os.path.join(ASSETS_DIR, 'squaresyphus.bundle')
+
+MAGIC = b'SQBUNDLE'
+VERSION = 1
+HEADER = struct.Struct('<8sII')  # magic, version, index length
+ALIGN = 16
+PIXEL_FORMAT = 'BGRA'  # Byte order of the usual 32-bit ARGB display surface, so convert_alpha is a plain copy
+
+# Every sprite the game loads, prepared the way it is drawn: name -> (filename, scale, size)
+GAME_IMAGES = {
+    'splash': ('splash.png', 1, (800, 600)),
+    'boulder_gray': ('boulder_gray.png', 1, None),
+    'boulder_orange': ('boulder_orange.png', 1, None),
+    'golden_boulder': ('golden_boulder.png', 1, None),
+    'clouds': ('Clouds-Sheet.png', 1, None),
+    'grass': ('grass.png', 2, None),
+    'music_icon': ('music-icon.png', 1, (32, 32)),
+    'next_icon': ('next-icon.png', 1, (32, 32)),
+}
+GAME_SOUNDS = {
+    'level_up': 'level-up.mp3',
+    'money_pickup': 'money-pickup.mp3',
+    'jump': 'jump.mp3',
+}
+
+
+def image_key(filename, scale=1, size=None):
+    # The same file can be wanted at several sizes, so the key names the preparation too
+    if size is not None:
+        return f"{filename}@{size[0]}x{size[1]}"
+    return f"{filename}@x{scale:g}"
+
+
+def prepare_image(surface, scale=1, size=None):
+    # Scale a freshly decoded image to the size the game draws it at
+    if size is None and scale != 1:
+        size = (int(surface.get_width() * scale), int(surface.get_height() * scale))
+    if size is not None and size != surface.get_size():
+        surface = pygame.transform.scale(surface, size)
+    return surface
+
+
+class AssetBundle:
+    """Read side of the pre-decoded asset bundle, memory-mapped so nothing is copied up front.
+
+    Layout: a header, a JSON index of entries (kind, offset, length and image size),
+    then the raw pixel and PCM blobs, each aligned to 16 bytes. Images become surfaces
+    that point straight into the mapping; sounds are only used when the mixer runs
+    at the format the bundle was built with.
+    """
+
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path}: not a version {VERSION} asset bundle")
+        index = json.loads(self.data[HEADER.size:HEADER.size + index_length])
+        self.mixer = tuple(index['mixer'])
+        self.entries = index['entries']
+
+    @classmethod
+    def open(cls, path=BUNDLE_PATH):
+        # The bundle is optional: without one the game decodes the raw files
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring asset bundle: {e}")
+            return None
+
+    def has(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        # PCM only plays right at the frequency, sample format and channels it was decoded for
+        return entry['kind'] == 'image' or pygame.mixer.get_init() == self.mixer
+
+    def buffer(self, entry):
+        return memoryview(self.data)[entry['offset']:entry['offset'] + entry['length']]
+
+    def load(self, key):
+        # Surfaces point into the mapping until they are converted; Sound copies the PCM
+        entry = self.entries[key]
+        if entry['kind'] == 'image':
+            return pygame.image.frombuffer(self.buffer(entry), tuple(entry['size']), entry['format'])
+        return pygame.mixer.Sound(buffer=self.buffer(entry))
+
+
+def build_bundle(path=BUNDLE_PATH, world_path=DEFAULT_WORLD):
+    """Decode, scale and pack every game sprite and sound effect into one bundle file."""
+    # Sounds are stored as PCM in the mixer's default format, which is what the game opens
+    pygame.mixer.init()
+    images = [(filename, scale, size) for filename, scale, size in GAME_IMAGES.values()]
+    images += [(decoration['image'], decoration['scale'], None) for decoration in load_world(world_path).decorations]
+
+    blobs = []  # (key, entry, bytes)
+    for filename, scale, size in images:
+        surface = prepare_image(pygame.image.load(os.path.join(ASSETS_DIR, filename)), scale, size)
+        key = image_key(filename, scale, size)
+        blobs.append((key, {'kind': 'image', 'size': list(surface.get_size()), 'format': PIXEL_FORMAT},
+                      pygame.image.tobytes(surface, PIXEL_FORMAT)))
+    for filename in GAME_SOUNDS.values():
+        sound = pygame.mixer.Sound(os.path.join(ASSETS_DIR, filename))
+        blobs.append((filename, {'kind': 'sound'}, sound.get_raw()))
+
+    # Offsets depend on the index length and the index holds the offsets, so lay out
+    # the blobs after a generously sized index and pad the index out to it
+    def layout(data_start):
+        entries, offset = {}, data_start
+        for key, entry, data in blobs:
+            entries[key] = dict(entry, offset=offset, length=len(data))
+            offset += -(-len(data) // ALIGN) * ALIGN
+        return entries
+
+    index = {'mixer': list(pygame.mixer.get_init()), 'entries': layout(0)}
+    reserved = -(-(len(json.dumps(index)) + 1024) // ALIGN) * ALIGN  # Room for the real offsets' digits
+    data_start = HEADER.size + reserved
+    index['entries'] = layout(data_start)
+    index_bytes = json.dumps(index).encode('utf-8').ljust(reserved)
+
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for key, entry, data in blobs:
+            f.write(data)
+            f.write(bytes(-len(data) % ALIGN))
+    os.replace(path + '.tmp', path)
+    return index['entries']
+
+
+if __name__ == "__main__":
+    # Build step, also run by squaresyphus.spec: python bundle.py [output path]
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    start = time.perf_counter()
+    output = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_PATH
+    entries = build_bundle(output)
+    print(f"Wrote {len(entries)} assets to {output} ({os.path.getsize(output) / 1024 / 1024:.1f} MB) "
+          f"in {time.perf_counter() - start:.2f}s")
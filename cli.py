@@ -0,0 +1,18 @@
+import math
+import sys
+
+# Small helpers shared by the command line tools (benchmark.py, balance.py, env.py).
+# Importing this has no side effects, unlike the tools themselves.
+
+
+def argument(flag, default=None):
+    # Value following a --flag on the command line
+    if flag in sys.argv:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return default
+
+
+def percentile(samples, p):
+    # Nearest rank, so every reported value is a sample that actually happened
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
@@ -0,0 +1,365 @@
+import os
+import time
+import weakref
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pygame
+
+from cli import argument
+from simulation import ACTION_SPAWN, Simulation
+from world import load_world
+
+# Reinforcement learning environments over the headless Simulation, with the Gymnasium
+# call signatures (reset -> obs, info; step -> obs, reward, terminated, truncated, info)
+# but without depending on it. An action is a bitmask of held keys, the same bits the
+# replay input log uses, plus the Small Boulder button.
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_JUMP = 4
+KEY_SPAWN = 8  # Spawn a fresh small boulder in front of the next hill
+NUM_ACTIONS = 16
+
+# The state observation, in this order
+OBSERVATION_FIELDS = (
+    'sisyphus_x', 'sisyphus_y', 'sisyphus_vx', 'sisyphus_vy', 'sisyphus_angle', 'sisyphus_angular_velocity',
+    'boulder_x', 'boulder_y', 'boulder_vx', 'boulder_vy', 'boulder_angular_velocity', 'boulder_radius',
+    'grounded', 'jump_cooldown', 'level',
+)
+VIEW_WIDTH = 800  # World pixels across a rendered observation, like the game window
+SEED = 1234
+WORKER_POLL = 1.0  # Seconds between checks that a shard worker is still alive while waiting on it
+
+
+class SisyphusEnv:
+    """One game as an environment: each step holds the action's keys for frame_skip ticks.
+
+    The reward is the money from hill passes during the step, as the game pays it.
+    The game has no end, so episodes only finish by truncation after max_episode_steps.
+    With pixels=(width, height) the observation is a dict of the state vector and a
+    downscaled RGB render centred on Sisyphus, like the game camera.
+    """
+
+    metadata = {'render_modes': ['rgb_array'], 'render_fps': 60}
+
+    def __init__(self, world=None, pixels=None, frame_skip=1, max_episode_steps=3600):
+        self.world = world if world is not None else load_world()
+        self.pixels = pixels
+        self.frame_skip = frame_skip
+        self.max_episode_steps = max_episode_steps
+        self.sim = None
+        self.steps = 0
+        self.background = None  # Sky and terrain for the whole world at render scale, drawn on first render
+        self.canvas = None
+
+    def reset(self, seed=None, options=None):
+        self.restart()
+        return self.observe(), self.info()
+
+    def step(self, action):
+        reward, truncated = self.advance(action)
+        return self.observe(), reward, False, truncated, self.info()
+
+    def restart(self):
+        # The simulation is deterministic, so a fresh one is the whole reset; seed is accepted for compatibility
+        self.sim = Simulation({}, self.world)
+        self.steps = 0
+
+    def advance(self, action):
+        # Plays one step and returns (reward, truncated), leaving the observation to the caller
+        sim = self.sim
+        money = sim.money
+        if action & KEY_SPAWN:
+            sim.perform(ACTION_SPAWN, 40)
+        left, right, jump = bool(action & KEY_LEFT), bool(action & KEY_RIGHT), bool(action & KEY_JUMP)
+        for _ in range(self.frame_skip):
+            sim.tick(left, right, jump)
+        self.steps += 1
+        return float(sim.money - money), self.steps >= self.max_episode_steps
+
+    def info(self):
+        return {'money': self.sim.money, 'hill_passes': self.sim.hill_passes, 'level': self.sim.calculate_strength_level()}
+
+    def observe(self):
+        state = np.zeros(len(OBSERVATION_FIELDS), dtype=np.float32)
+        self.write_state(state)
+        if self.pixels is None:
+            return state
+        width, height = self.pixels
+        pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.write_pixels(pixels)
+        return {'state': state, 'pixels': pixels}
+
+    def write_state(self, out):
+        # Fills a row of OBSERVATION_FIELDS in place, so vector envs write straight into their batch
+        sim = self.sim
+        body = sim.sisyphus
+        out[0:6] = (*body.position, *body.velocity, body.angle, body.angular_velocity)
+        if sim.current_boulder:
+            boulder = sim.current_boulder['body']
+            out[6:12] = (*boulder.position, *boulder.velocity, boulder.angular_velocity, sim.current_boulder['shape'].radius)
+        else:
+            out[6:12] = 0
+        out[12:15] = (sim.is_grounded, sim.jump_cooldown, sim.calculate_strength_level())
+
+    def render(self):
+        width, height = self.pixels or (VIEW_WIDTH // 4, int(self.world.height) // 4)
+        pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.write_pixels(pixels)
+        return pixels
+
+    def write_pixels(self, out):
+        # out is (height, width, 3); the view is VIEW_WIDTH world pixels wide and the world's full height
+        height, width = out.shape[:2]
+        scale_x, scale_y = width / VIEW_WIDTH, height / self.world.height
+        if self.canvas is None or self.canvas.get_size() != (width, height):
+            self.background = pygame.Surface((int(self.world.width * scale_x) + 1, height))
+            self.background.fill((135, 206, 235))  # Sky blue, as in the game
+            ground_top = (self.world.ground_y - 10) * scale_y  # Top of the ground slab
+            self.background.fill((139, 69, 19), (0, ground_top, self.background.get_width(), height - ground_top))
+            for terrain in self.world.terrain:
+                pygame.draw.polygon(self.background, terrain['color'],
+                                    [(x * scale_x, y * scale_y) for x, y in terrain['points']])
+            self.canvas = pygame.Surface((width, height))
+
+        sim = self.sim
+        camera_x = max(0, min(sim.sisyphus.position.x - VIEW_WIDTH / 2, self.world.width - VIEW_WIDTH))
+        self.canvas.blit(self.background, (-camera_x * scale_x, 0))
+        for shape in sim.boulders:
+            x, y = shape.body.position
+            color = (255, 215, 0) if shape.radius == 150 else (128, 128, 128)  # Golden boulder stands out
+            pygame.draw.circle(self.canvas, color, ((x - camera_x) * scale_x, y * scale_y),
+                               max(1, shape.radius * scale_x))
+        body = sim.sisyphus
+        vertices = [body.local_to_world(v) for v in sim.sisyphus_shape.get_vertices()]
+        pygame.draw.polygon(self.canvas, (255, 0, 0), [((x - camera_x) * scale_x, y * scale_y) for x, y in vertices])
+        out[:] = pygame.surfarray.pixels3d(self.canvas).transpose(1, 0, 2)
+
+    def close(self):
+        self.sim = None
+
+
+def batch_arrays(num_envs, pixels):
+    # Name -> (shape, dtype) of every array a vector env shares between its environments and the caller
+    arrays = {
+        'actions': ((num_envs,), np.uint8),
+        'states': ((num_envs, len(OBSERVATION_FIELDS)), np.float32),
+        'final_states': ((num_envs, len(OBSERVATION_FIELDS)), np.float32),  # Last state of an episode that just ended
+        'rewards': ((num_envs,), np.float32),
+        'terminated': ((num_envs,), np.bool_),
+        'truncated': ((num_envs,), np.bool_),
+    }
+    if pixels is not None:
+        width, height = pixels
+        arrays['pixels'] = ((num_envs, height, width, 3), np.uint8)
+    return arrays
+
+
+def reset_batch(envs, arrays, first):
+    for i, env in enumerate(envs, first):
+        env.restart()
+        write_observation(env, arrays, i)
+
+
+def step_batch(envs, arrays, first):
+    # Steps envs, which own rows first.. of arrays, resetting any whose episode ended
+    actions = arrays['actions']
+    for i, env in enumerate(envs, first):
+        arrays['rewards'][i], arrays['truncated'][i] = env.advance(actions[i])
+        if arrays['truncated'][i]:  # Never terminated, the game has no end
+            env.write_state(arrays['final_states'][i])
+            env.restart()
+        write_observation(env, arrays, i)
+
+
+def write_observation(env, arrays, i):
+    env.write_state(arrays['states'][i])
+    if 'pixels' in arrays:
+        env.write_pixels(arrays['pixels'][i])
+
+
+class VectorEnv:
+    """num_envs independent games stepped one after another in this process.
+
+    Observations, rewards and flags come back as batched arrays. An environment whose
+    episode ended is reset within the same step: its row holds the new episode's first
+    observation and info['final_state'] the last state of the old one, flagged by
+    info['done']. The returned arrays are reused, so the next step overwrites them.
+    """
+
+    def __init__(self, num_envs, world_path=None, pixels=None, **options):
+        self.num_envs = num_envs
+        self.pixels = pixels
+        world = load_world(world_path) if world_path else load_world()
+        self.envs = [SisyphusEnv(world, pixels, **options) for _ in range(num_envs)]
+        self.arrays = {name: np.zeros(shape, dtype) for name, (shape, dtype) in batch_arrays(num_envs, pixels).items()}
+
+    def observations(self):
+        if self.pixels is None:
+            return self.arrays['states']
+        return {'state': self.arrays['states'], 'pixels': self.arrays['pixels']}
+
+    def reset(self, seed=None, options=None):
+        reset_batch(self.envs, self.arrays, 0)
+        return self.observations(), {}
+
+    def step(self, actions):
+        self.arrays['actions'][:] = actions
+        self.run_step()
+        arrays = self.arrays
+        done = arrays['terminated'] | arrays['truncated']
+        return (self.observations(), arrays['rewards'], arrays['terminated'], arrays['truncated'],
+                {'done': done, 'final_state': arrays['final_states']})
+
+    def run_step(self):
+        step_batch(self.envs, self.arrays, 0)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def shard_worker(connection, names, num_envs, first, count, world_path, pixels, options):
+    # Owns envs first..first + count and steps them whenever the parent says so
+    memories = [SharedMemory(name) for name in names.values()]
+    arrays = {name: np.ndarray(shape, dtype, buffer=memory.buf)
+              for memory, (name, (shape, dtype)) in zip(memories, batch_arrays(num_envs, pixels).items())}
+    world = load_world(world_path) if world_path else load_world()
+    envs = [SisyphusEnv(world, pixels, **options) for _ in range(count)]
+    try:
+        while True:
+            command = connection.recv()
+            if command == 'step':
+                step_batch(envs, arrays, first)
+            elif command == 'reset':
+                reset_batch(envs, arrays, first)
+            else:
+                break
+            connection.send(None)
+    finally:
+        del arrays  # Views into the buffers have to go before the buffers can close
+        for memory in memories:
+            memory.close()
+
+
+def close_shards(connections, workers, arrays, memories):
+    # Stops the workers and frees the shared memory; also run by the finalizer if close() never was
+    for connection in connections:
+        try:
+            connection.send('close')
+        except OSError:
+            pass  # Worker already gone
+    for worker in workers:
+        worker.join(WORKER_POLL)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+    arrays.clear()  # Views into the buffers have to go before the buffers can close
+    for memory in memories:
+        memory.close()
+        memory.unlink()
+
+
+class ShardedVectorEnv(VectorEnv):
+    """VectorEnv split across worker processes, one contiguous shard of environments each.
+
+    Actions, observations, rewards and flags live in shared memory, so a step only sends
+    each worker a one-word command and waits for its reply; nothing is pickled per step.
+    Close it, or use it in a with block; the shared memory is unlinked on garbage
+    collection otherwise. A worker that dies raises RuntimeError instead of hanging the step.
+    """
+
+    def __init__(self, num_envs, processes=None, world_path=None, pixels=None, **options):
+        self.num_envs = num_envs
+        self.pixels = pixels
+        self.envs = []
+        self.arrays = {}
+        self.connections = []
+        self.workers = []
+        memories = []
+        self.finalizer = weakref.finalize(self, close_shards, self.connections, self.workers, self.arrays, memories)
+        names = {}
+        for name, (shape, dtype) in batch_arrays(num_envs, pixels).items():
+            memory = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            memories.append(memory)
+            names[name] = memory.name
+            self.arrays[name] = np.ndarray(shape, dtype, buffer=memory.buf)
+
+        processes = min(processes or os.cpu_count(), num_envs)
+        first = 0
+        for shard in range(processes):
+            count = num_envs // processes + (shard < num_envs % processes)
+            parent, child = Pipe()
+            worker = Process(target=shard_worker, daemon=True,
+                             args=(child, names, num_envs, first, count, world_path, pixels, options))
+            worker.start()
+            child.close()  # Only the worker's copy stays open, so its death shows up as EOF here
+            self.connections.append(parent)
+            self.workers.append(worker)
+            first += count
+
+    def command(self, command):
+        for connection, worker in zip(self.connections, self.workers):
+            try:
+                connection.send(command)
+            except OSError:
+                self.worker_died(worker)
+        for connection, worker in zip(self.connections, self.workers):
+            # Poll rather than block on recv, so a worker that died raises instead of hanging the step
+            while not connection.poll(WORKER_POLL):
+                if not worker.is_alive():
+                    self.worker_died(worker)
+            try:
+                connection.recv()
+            except (EOFError, OSError):
+                self.worker_died(worker)
+
+    def worker_died(self, worker):
+        worker.join(WORKER_POLL)  # Reap it for the exit code
+        self.close()
+        raise RuntimeError(f"env worker {worker.pid} died with exit code {worker.exitcode}")
+
+    def reset(self, seed=None, options=None):
+        self.command('reset')
+        return self.observations(), {}
+
+    def run_step(self):
+        self.command('step')
+
+    def close(self):
+        self.finalizer()
+
+
+def measure(env, num_envs, steps, rng):
+    # Environment steps per second, counting every environment in a batch
+    env.reset()
+    batched = num_envs > 1 or isinstance(env, VectorEnv)
+    actions = rng.integers(0, NUM_ACTIONS, size=(steps, num_envs) if batched else steps)
+    start = time.perf_counter()
+    for action in actions:
+        env.step(action)
+    return steps * num_envs / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    # python env.py [--envs N] [--processes P] [--steps S] [--pixels WxH]: throughput with random actions
+    num_envs = int(argument('--envs', os.cpu_count() * 4))
+    processes = int(argument('--processes', os.cpu_count()))
+    steps = int(argument('--steps', 2000))
+    pixels = tuple(int(v) for v in argument('--pixels').split('x')) if argument('--pixels') else None
+    rng = np.random.default_rng(SEED)
+
+    env = SisyphusEnv(pixels=pixels)
+    print(f"single       {measure(env, 1, steps, rng):10.0f} steps/s")
+    with VectorEnv(num_envs, pixels=pixels) as env:
+        print(f"batched x{num_envs:<3} {measure(env, num_envs, steps // num_envs + 1, rng):10.0f} steps/s")
+    with ShardedVectorEnv(num_envs, processes, pixels=pixels) as env:
+        print(f"sharded x{num_envs:<3} {measure(env, num_envs, steps // num_envs + 1, rng):10.0f} steps/s "
+              f"on {processes} processes")
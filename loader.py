@@ -0,0 +1,95 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+
+from bundle import image_key, prepare_image
+
+
+class AssetLoader:
+    """Decodes images and sounds on a thread pool while the main thread keeps the window alive.
+
+    Assets found in the pre-built bundle are served from it without decoding; the
+    rest are decoded and scaled by the workers. Only convert_alpha, which needs the
+    display, is left to the main thread. Failed loads are reported and come back
+    as None, so each caller keeps its own fallback.
+    """
+
+    def __init__(self, assets_dir, bundle=None, workers=4):
+        self.assets_dir = assets_dir
+        self.bundle = bundle
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assets')
+        self.jobs = {}     # name -> (filename, future)
+        self.timings = {}  # name -> seconds spent loading
+
+    def timed(self, name, load, *args):
+        start = time.perf_counter()
+        try:
+            return load(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def decode(self, name, filename, key, load):
+        if self.bundle is not None and self.bundle.has(key):
+            # Already decoded at build time, so there is nothing to hand to the workers
+            future = Future()
+            future.set_result(self.timed(name, self.bundle.load, key))
+        else:
+            future = self.executor.submit(self.timed, name, load, os.path.join(self.assets_dir, filename))
+        self.jobs[name] = (filename, future)
+
+    def image(self, name, filename, scale=1, size=None):
+        self.decode(name, filename, image_key(filename, scale, size),
+                    lambda path: prepare_image(pygame.image.load(path), scale, size))
+
+    def sound(self, name, filename):
+        self.decode(name, filename, filename, pygame.mixer.Sound)
+
+    def progress(self):
+        done = sum(1 for _, future in self.jobs.values() if future.done())
+        return done / len(self.jobs) if self.jobs else 1.0
+
+    def done(self):
+        return all(future.done() for _, future in self.jobs.values())
+
+    def result(self, name):
+        filename, future = self.jobs[name]
+        try:
+            return future.result()
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Failed to load {filename}: {e}")
+            return None
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class StartupReport:
+    """Wall time per startup phase, plus per-asset decode times from an AssetLoader."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []  # (phase, seconds)
+
+    def mark(self, phase):
+        # Close the phase that just finished
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def format(self, loader=None):
+        lines = ["Startup timing:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<24} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<24} {(self.last - self.start) * 1000:8.1f} ms")
+        if loader is not None and loader.timings:
+            # Decoding overlaps across workers, so these add up to more than the asset phase
+            lines.append("Asset decode times:")
+            for name, seconds in sorted(loader.timings.items(), key=lambda item: -item[1]):
+                lines.append(f"  {loader.jobs[name][0]:<24} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
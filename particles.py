@@ -0,0 +1,171 @@
+import numpy as np
+import pygame
+
+
+class ParticleSystem:
+    """Structure-of-arrays particles updated with vectorized NumPy operations.
+
+    Positions, velocities, sizes and lives live in preallocated arrays; only the
+    first `count` rows are in use. Dead particles are removed by compacting the
+    survivors to the front, so a burst of thousands costs a handful of array ops.
+    A particle dies when its size shrinks to zero (if `shrink` is set) or when its
+    life fades to zero (if `fade` is set). Optional per-particle labels turn the
+    system into floating text, e.g. the "+$5" money popups.
+    """
+
+    def __init__(self, shrink=0.0, fade=0.0, capacity=256):
+        self.shrink = shrink  # Size lost per tick
+        self.fade = fade      # Life lost per tick (life starts at 1.0)
+        self.count = 0
+        self.positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.sizes = np.zeros(capacity)
+        self.lives = np.zeros(capacity)
+        self.labels = []  # Only used by text particles, kept in step with the arrays
+        self.rng = np.random.default_rng()
+        self.circle_sprites = {}  # (color, radius) -> pre-drawn circle
+        self.label_sprites = {}   # (label, size, alpha) -> faded copy of the rendered text
+
+    def __len__(self):
+        return self.count
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def clear(self):
+        self.count = 0
+        self.labels = []
+
+    def reserve(self, extra):
+        # Grow the arrays geometrically when a burst doesn't fit
+        needed = self.count + extra
+        capacity = len(self.sizes)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('positions', 'velocities', 'sizes', 'lives'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:])
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def emit(self, positions, velocities, sizes, labels=None):
+        n = len(sizes)
+        self.reserve(n)
+        start, end = self.count, self.count + n
+        self.positions[start:end] = positions
+        self.velocities[start:end] = velocities
+        self.sizes[start:end] = sizes
+        self.lives[start:end] = 1.0
+        if labels is not None:
+            self.labels.extend(labels)
+        self.count = end
+
+    def burst(self, n, position, speed, min_size, max_size):
+        # n particles from one point with velocities uniform in [-speed, speed] on both axes
+        self.emit(
+            np.broadcast_to(np.asarray(position, dtype=float), (n, 2)),
+            self.rng.uniform(-speed, speed, (n, 2)),
+            self.rng.integers(min_size, max_size + 1, n),
+        )
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.positions[:n] += self.velocities[:n]
+        alive = np.ones(n, dtype=bool)
+        if self.shrink:
+            self.sizes[:n] -= self.shrink
+            alive &= self.sizes[:n] > 0
+        if self.fade:
+            self.lives[:n] -= self.fade
+            alive &= self.lives[:n] > 0
+
+        # Compact the survivors to the front of the arrays
+        survivors = int(np.count_nonzero(alive))
+        if survivors < n:
+            for array in (self.positions, self.velocities, self.sizes, self.lives):
+                array[:survivors] = array[:n][alive]
+            if self.labels:
+                self.labels = [label for label, keep in zip(self.labels, alive) if keep]
+            self.count = survivors
+
+    def visible(self, camera_x, width, height, margins):
+        # Indices of particles whose extent (position +/- margins) overlaps the view
+        n = self.count
+        x = self.positions[:n, 0] - camera_x
+        y = self.positions[:n, 1]
+        return np.flatnonzero((x + margins[0] >= 0) & (x - margins[0] < width) &
+                              (y + margins[1] >= 0) & (y - margins[1] < height))
+
+    def get_circle_sprite(self, color, radius):
+        key = (color, radius)
+        sprite = self.circle_sprites.get(key)
+        if sprite is None:
+            # Colorkeyed and RLE encoded, which blits faster than per-pixel alpha.
+            # 2r + 1 across: pygame 1.x fills out to r pixels right of and below the centre
+            # pixel (r, r) and 2.x to r - 1, so either way the circle isn't clipped
+            sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1)).convert()
+            sprite.fill((255, 0, 255))
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            sprite.set_colorkey((255, 0, 255), pygame.RLEACCEL)
+            self.circle_sprites[key] = sprite
+        return sprite
+
+    def draw_circles(self, surface, color, camera_x=0):
+        # Blit every on-screen particle in one batch; returns the rect covering them
+        n = self.count
+        if n == 0:
+            return None
+        width, height = surface.get_size()
+        radii = self.sizes[:n].astype(int)
+        index = self.visible(camera_x, width, height, (radii, radii))
+        index = index[radii[index] >= 1]
+        if len(index) == 0:
+            return None
+
+        radii = radii[index]
+        left = (self.positions[index, 0] - camera_x).astype(int) - radii
+        top = self.positions[index, 1].astype(int) - radii
+        get_sprite = self.get_circle_sprite
+        surface.blits([
+            (get_sprite(color, r), (x, y))
+            for r, x, y in zip(radii.tolist(), left.tolist(), top.tolist())
+        ], doreturn=False)
+        return pygame.Rect(int(left.min()), int(top.min()),
+                           int((left + 2 * radii + 1).max() - left.min()),
+                           int((top + 2 * radii + 1).max() - top.min()))
+
+    def get_label_sprite(self, render, label, size, alpha):
+        # Faded copies are cached so one blits batch can hold the same text at different alphas
+        key = (label, size, alpha)
+        sprite = self.label_sprites.get(key)
+        if sprite is None:
+            if len(self.label_sprites) >= 1024:  # Labels change with the amounts earned; don't grow forever
+                self.label_sprites.clear()
+            sprite = render(label, size).copy()
+            sprite.set_alpha(alpha)
+            self.label_sprites[key] = sprite
+        return sprite
+
+    def draw_labels(self, surface, render, camera_x=0, max_width=200):
+        # Blit the on-screen text particles in one batch, faded by their remaining life;
+        # render(label, size) gives the surface, max_width bounds how wide a label gets
+        n = self.count
+        if n == 0:
+            return []
+        width, height = surface.get_size()
+        x = (self.positions[:n, 0] - camera_x).astype(int)
+        y = self.positions[:n, 1].astype(int)
+        # Labels hang right and down from their position, at most max_width across
+        index = np.flatnonzero((x + max_width >= 0) & (x < width) & (y + max_width >= 0) & (y < height)).tolist()
+        sizes = self.sizes[:n].astype(int).tolist()
+        alphas = ((self.lives[:n] * 255).astype(int) & ~7).tolist()  # 32 fade steps
+        left, top = x.tolist(), y.tolist()
+        get_sprite = self.get_label_sprite
+        return surface.blits([
+            (get_sprite(render, self.labels[i], sizes[i], alphas[i]), (left[i], top[i]))
+            for i in index
+        ])
@@ -0,0 +1,120 @@
+import csv
+import time
+
+import numpy as np
+import pygame
+
+
+# Frame phases in the order the game loop runs them. Time between two laps is charged
+# to the phase named by the second one, so every microsecond of a frame lands somewhere.
+PHASES = (
+    'events',         # handle_events
+    'move_sisyphus',  # Input forces and resizing
+    'space.step',     # Crushing timers, hill rewards and the physics step
+    'effects',        # Particles, clouds and music fade
+    'world',          # Back and front world layers (sky, hills, grass)
+    'clouds',
+    'shapes',         # Sisyphus, drawn from his body transform
+    'boulders',
+    'particles',
+    'debug_draw',     # pymunk's debug view, only while toggled on with F2
+    'hud',            # Money, stats, buttons, timer and the congratulations screen
+    'overlay',        # This profiler's own overlay
+    'present',        # display.flip / display.update
+    'clock',          # clock.tick waiting for the frame rate cap
+)
+PHASE_COLUMNS = {phase: i for i, phase in enumerate(PHASES)}
+WORK_COLUMNS = [i for i, phase in enumerate(PHASES) if phase != 'clock']  # Everything but the idle wait
+
+
+class FrameProfiler:
+    """Per-phase frame timings in a fixed-size ring buffer, with an overlay and CSV dump.
+
+    The game calls lap(phase) at the end of each phase and end_frame() once per frame,
+    which is a perf_counter call and a list update each, so it stays on all the time
+    and a hitch can be dumped after the fact. Only draw() costs anything, and only
+    while the overlay is visible.
+    """
+
+    def __init__(self, capacity=600):
+        self.samples = np.zeros((capacity, len(PHASES)))  # Seconds per phase, one row per frame
+        self.frames = 0  # Frames recorded; row frames % capacity is written next
+        self.current = [0.0] * len(PHASES)
+        self.last = time.perf_counter()
+        self.visible = False
+        self.summary = []       # Rendered overlay text lines, refreshed a few times a second
+        self.summary_frame = -1
+
+    def start(self):
+        # Drop whatever happened before the game loop, e.g. time spent in the menu
+        self.last = time.perf_counter()
+        self.current = [0.0] * len(PHASES)
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[PHASE_COLUMNS[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        self.samples[self.frames % len(self.samples)] = self.current
+        self.frames += 1
+        self.current = [0.0] * len(PHASES)
+
+    def recorded(self):
+        # The buffered rows, oldest first
+        count = min(self.frames, len(self.samples))
+        start = self.frames - count
+        return np.roll(self.samples, -(start % len(self.samples)), axis=0)[:count]
+
+    def dump_csv(self, path):
+        rows = self.recorded() * 1000
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'total_ms'] + [f"{phase}_ms" for phase in PHASES])
+            first = self.frames - len(rows)
+            for i, row in enumerate(rows):
+                writer.writerow([first + i, f"{row.sum():.3f}"] + [f"{value:.3f}" for value in row])
+        return len(rows)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def update_summary(self, rows, render_text):
+        # Worst offenders: phases by their mean over the buffer, with their worst frame
+        work = rows[:, WORK_COLUMNS].sum(axis=1)
+        means = rows.mean(axis=0)
+        worst = rows.max(axis=0)
+        lines = [f"work avg {work.mean():5.2f}  max {work.max():5.2f} ms"]
+        for column in sorted(WORK_COLUMNS, key=lambda column: -means[column])[:5]:
+            lines.append(f"{PHASES[column]:<13} {means[column]:5.2f}  max {worst[column]:5.2f}")
+        self.summary = [render_text(line) for line in lines]
+
+    def draw(self, surface, render_text, position, width=300, graph_height=80):
+        """Frame time graph (one column per recorded frame) and the top phases; returns the rect drawn."""
+        rows = self.recorded()[-width:] * 1000
+        if not len(rows):
+            return None
+        if self.frames - self.summary_frame >= 15:
+            self.update_summary(rows, render_text)
+            self.summary_frame = self.frames
+
+        x, y = position
+        line_height = 16
+        rect = pygame.Rect(x, y, width, graph_height + 4 + line_height * len(self.summary))
+        panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+
+        # Work per frame, the wait for the frame cap left out; 33 ms fills the graph, guides at 60 and 30 fps
+        scale = graph_height / 33.3
+        totals = rows[:, WORK_COLUMNS].sum(axis=1)
+        for i, total in enumerate(totals):
+            height = min(graph_height, total * scale)
+            color = (80, 220, 80) if total < 16.7 else (240, 200, 60) if total < 33.3 else (240, 70, 70)
+            pygame.draw.line(panel, color, (width - len(totals) + i, graph_height),
+                             (width - len(totals) + i, graph_height - height))
+        for ms in (16.7, 33.3):
+            pygame.draw.line(panel, (255, 255, 255, 90), (0, graph_height - ms * scale), (width, graph_height - ms * scale))
+
+        for i, line in enumerate(self.summary):
+            panel.blit(line, (4, graph_height + 4 + i * line_height))
+        return surface.blit(panel, rect)
@@ -0,0 +1,216 @@
+import base64
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+
+from simulation import ACTION_NEW_GAME, Simulation
+from world import World
+
+
+# Input log: a header, the JSON start state, then one record per input change or action.
+# A record is the number of ticks since the previous record as a varint, an opcode byte
+# and, for actions, the boulder size as a varint. Held keys cost nothing until they change,
+# so the log grows with the number of key presses rather than the length of the run.
+# The start state embeds the world file's contents, so a log replays anywhere, whatever
+# worlds (or temporary PyInstaller directory) the recording machine had.
+MAGIC = b'SQREPLAY'
+VERSION = 2
+HEADER = struct.Struct('<8sHQI')  # magic, version, seed, start state length
+CLAIMED_TIME = struct.Struct('<d')
+
+OP_INPUT = 0x00   # Low bits are the held keys: 1 left, 2 right, 4 jump
+OP_ACTION = 0x10  # Low bits are the action, followed by the size
+OP_END = 0xff     # Followed by the claimed speedrun time, NaN when the run didn't finish
+
+
+def write_varint(data, value):
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("input log is truncated")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class InputRecorder:
+    """Logs the input of every simulation tick; attach it as Simulation.recorder.
+
+    The start state is a save dict (with its physics snapshot) taken right after the
+    game was built, so playback starts from exactly the same space. Nothing is
+    written until close().
+    """
+
+    def __init__(self, path, seed, world, start_state):
+        self.path = path
+        self.ticks = 0      # Ticks recorded so far
+        self.last_tick = 0  # Tick of the previous record
+        self.keys = 0
+        world_state = {'name': os.path.basename(world.path), 'data': world.data}
+        state = json.dumps({'world': world_state, 'save': start_state}).encode('utf-8')
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, seed, len(state)))
+        self.data += state
+
+    def record(self, opcode):
+        write_varint(self.data, self.ticks - self.last_tick)
+        self.data.append(opcode)
+        self.last_tick = self.ticks
+
+    def record_input(self, left, right, jump):
+        keys = bool(left) | bool(right) << 1 | bool(jump) << 2
+        if keys != self.keys:
+            self.record(OP_INPUT | keys)
+            self.keys = keys
+        self.ticks += 1
+
+    def record_action(self, action, size):
+        # Applies before the next tick, as a button press between frames does
+        self.record(OP_ACTION | action)
+        write_varint(self.data, size)
+
+    def close(self, claimed_time=None):
+        self.record(OP_END)
+        self.data += CLAIMED_TIME.pack(math.nan if claimed_time is None else claimed_time)
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+
+
+class Replay:
+    """A decoded input log: seed, start state and (tick, opcode, size) records."""
+
+    def __init__(self, data, path='<replay>'):
+        self.path = path
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path}: not an input log")
+        magic, version, self.seed, state_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} input log")
+        offset = HEADER.size + state_length
+        if offset > len(data):
+            raise ValueError(f"{path}: input log is truncated")
+        try:
+            state = json.loads(data[HEADER.size:offset])
+            world, self.start_state = state['world'], state['save']
+            self.world_name = world['name']
+            self.world = World(world['data'], f"{path}: world {world['name']}")  # Validated like a world file
+        except (KeyError, TypeError, AttributeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"{path}: damaged start state ({e!r})") from e
+
+        self.records = []
+        tick = 0
+        while True:
+            delta, offset = read_varint(data, offset)
+            tick += delta
+            if offset >= len(data):
+                raise ValueError(f"{path}: input log is truncated")
+            opcode = data[offset]
+            offset += 1
+            if opcode == OP_END:
+                break
+            size = 0
+            if opcode & 0xf0 == OP_ACTION:
+                size, offset = read_varint(data, offset)
+            elif opcode & 0xf0 != OP_INPUT:
+                raise ValueError(f"{path}: unknown record {opcode:#x} at tick {tick}")
+            self.records.append((tick, opcode, size))
+        self.ticks = tick
+        if offset + CLAIMED_TIME.size > len(data):
+            raise ValueError(f"{path}: input log is truncated")
+        claimed_time, = CLAIMED_TIME.unpack_from(data, offset)
+        self.claimed_time = None if math.isnan(claimed_time) else claimed_time
+
+
+def load_replay(path):
+    with open(path, 'rb') as f:
+        return Replay(f.read(), path)
+
+
+class ReplaySimulation(Simulation):
+    """Plays an input log back headless, as fast as the physics runs.
+
+    Also keeps the speedrun clock in ticks: it starts from the recorded elapsed time,
+    restarts on a new game and stops when the golden boulder is unlocked.
+    """
+
+    def __init__(self, replay):
+        random.seed(replay.seed)
+        super().__init__(replay.start_state, replay.world)
+        if replay.start_state.get('snapshot'):
+            self.restore_snapshot(base64.b64decode(replay.start_state['snapshot']))
+        self.replay = replay
+        self.ticks = 0
+        self.timer_start_tick = 0
+        self.timer_offset = replay.start_state.get('elapsed_time', 0)
+        self.completion_time = None
+
+    def on_unlock(self, size):
+        if size == 150 and self.completion_time is None:
+            self.completion_time = self.timer_offset + (self.ticks - self.timer_start_tick) * self.dt
+
+    def perform(self, action, size=40):
+        super().perform(action, size)
+        if action == ACTION_NEW_GAME:
+            self.timer_start_tick = self.ticks
+            self.timer_offset = 0
+            self.completion_time = None
+
+    def play(self):
+        keys = 0
+        for tick, opcode, size in self.replay.records:
+            self.run_ticks(tick, keys)
+            if opcode & 0xf0 == OP_ACTION:
+                self.perform(opcode & 0x0f, size)
+            else:
+                keys = opcode & 0x0f
+        self.run_ticks(self.replay.ticks, keys)
+
+    def run_ticks(self, until, keys):
+        left, right, jump = bool(keys & 1), bool(keys & 2), bool(keys & 4)
+        while self.ticks < until:
+            self.tick(left, right, jump)
+            self.ticks += 1
+
+
+if __name__ == "__main__":
+    # python replay.py run.sqr [--verify]: play a recording back headless and report the outcome
+    if len(sys.argv) < 2:
+        print("usage: python replay.py <input log> [--verify]")
+        sys.exit(2)
+    try:
+        replay = load_replay(sys.argv[1])
+        sim = ReplaySimulation(replay)  # A damaged physics snapshot only shows up once restored
+    except (OSError, ValueError) as e:
+        print(f"Invalid input log: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    sim.play()
+    elapsed = time.perf_counter() - start
+    game_seconds = replay.ticks * sim.dt
+    print(f"{replay.path}: {replay.ticks} ticks in {replay.world_name} ({game_seconds:.1f}s of play) from {len(replay.records)} records, "
+          f"replayed in {elapsed:.2f}s ({game_seconds / max(elapsed, 1e-9):.0f}x real time)")
+    print(f"money {sim.money}, xp {sim.strength_xp}, level {sim.calculate_strength_level()}, "
+          f"{sim.hill_passes} hill passes, sisyphus at ({sim.sisyphus.position.x:.2f}, {sim.sisyphus.position.y:.2f})")
+
+    if sim.completion_time is not None:
+        print(f"Golden boulder unlocked at {sim.completion_time:.2f}s of simulated play")
+    if replay.claimed_time is not None:
+        # Ticks only ever lag real time, so an honest timer reads at least the simulated time
+        verified = sim.completion_time is not None and replay.claimed_time >= sim.completion_time - sim.dt
+        print(f"Claimed time {replay.claimed_time:.2f}s: {'verified' if verified else 'NOT verified'}")
+        if '--verify' in sys.argv and not verified:
+            sys.exit(1)
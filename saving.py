@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+
+def backup_path(path):
+    return path + '.bak'
+
+
+def load_save_file(path):
+    """Read a save, falling back to the last-good backup if the save is missing or damaged."""
+    for candidate in (path, backup_path(path)):
+        try:
+            with open(candidate, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            continue
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Save file {candidate} is damaged ({e}), trying the backup")
+    return {}
+
+
+def delete_save_file(path):
+    for candidate in (path, backup_path(path)):
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def is_good_save(path):
+    try:
+        with open(path, 'r') as f:
+            json.load(f)
+        return True
+    except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+        return False
+
+
+def keep_backup(path):
+    # Link the save in as the backup rather than moving it, so `path` itself never goes missing
+    temp_path = backup_path(path) + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(path, temp_path)
+    except OSError:
+        shutil.copyfile(path, temp_path)  # Filesystem without hard links
+    os.replace(temp_path, backup_path(path))
+
+
+def write_atomically(path, data):
+    # Write the new save beside the old one and only swap it in once it is safely on disk.
+    # The save being replaced becomes the backup if it still reads back, so a damaged save
+    # never pushes out the last good copy and a crash at any point leaves one.
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    if is_good_save(path):
+        keep_backup(path)
+    os.replace(temp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        # Make the renames themselves durable (POSIX only)
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+class SaveWriter:
+    """Write-behind saver: save() hands over a snapshot and returns immediately.
+
+    A background thread waits `debounce` seconds after the first request so a burst
+    of saves turns into one write of the latest snapshot, then writes it atomically.
+    flush() blocks until everything requested so far is on disk.
+    """
+
+    def __init__(self, debounce=0.5):
+        self.debounce = debounce
+        self.condition = threading.Condition()
+        self.pending = None       # (path, data) waiting to be written
+        self.requested_at = None  # When the oldest unwritten request came in
+        self.writing = False
+        self.closed = False
+        self.writes = 0           # Completed writes, handy for checking the coalescing
+        self.thread = threading.Thread(target=self.run, name='save-writer', daemon=True)
+        self.thread.start()
+
+    def save(self, path, data):
+        with self.condition:
+            if self.pending is None:
+                self.requested_at = time.monotonic()
+            self.pending = (path, data)
+            self.condition.notify()
+
+    def cancel(self):
+        # Drop anything not yet written, e.g. when the save is being deleted
+        with self.condition:
+            self.pending = None
+            while self.writing:
+                self.condition.wait()
+
+    def flush(self):
+        with self.condition:
+            self.requested_at = 0  # Due now
+            self.condition.notify()
+            while self.pending is not None or self.writing:
+                self.condition.wait()
+
+    def close(self):
+        self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.closed and (self.pending is None or
+                                           time.monotonic() < self.requested_at + self.debounce):
+                    if self.pending is None:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(self.requested_at + self.debounce - time.monotonic())
+                if self.pending is None:
+                    return  # Closed with nothing left to write
+                path, data = self.pending
+                self.pending = None
+                self.writing = True
+
+            try:
+                write_atomically(path, data)
+            except Exception as e:
+                print(f"Failed to save progress: {e}")
+
+            with self.condition:
+                self.writing = False
+                self.writes += 1
+                self.condition.notify_all()
@@ -0,0 +1,735 @@
+import pygame
+import pymunk
+import struct
+import time
+from bisect import bisect_right
+
+from world import load_world
+
+
+# Versioned, fixed-size physics snapshot: Sisyphus, the current boulder, cooldowns and camera.
+# Bodies are (x, y, vx, vy, angle, angular velocity). Bump the version when the layout changes.
+SNAPSHOT_MAGIC = b'SQSN'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<4sH')
+SNAPSHOT = struct.Struct(
+    '<4sH'
+    '6dd'   # Sisyphus body, box size
+    'ii?'   # Jump cooldown, spawn cooldown, grounded
+    'd'     # Camera x
+    '?d6d'  # Has boulder, boulder radius, boulder body
+    'ii?'   # Boulder money reward, xp gain, reached bottom since last payout
+)
+
+
+# Player actions besides movement, the ones an input recording has to replay
+ACTION_SPAWN = 1             # Small boulder button: spawn_boulder(size, 1)
+ACTION_UNLOCK_AND_SPAWN = 2  # Bigger boulder buttons: unlock_and_spawn(size)
+ACTION_NEW_GAME = 3          # Wipe progress and start over with the small boulder
+
+
+def body_state(body):
+    return (*body.position, *body.velocity, body.angle, body.angular_velocity)
+
+
+def set_body_state(body, state):
+    body.position = state[0:2]
+    body.velocity = state[2:4]
+    body.angle = state[4]
+    body.angular_velocity = state[5]
+
+
+class Progression:
+    """Strength level bookkeeping from a precomputed cumulative XP table.
+
+    level, xp_in_level, xp_required and progress are recomputed only when the XP
+    changes, so reading them every frame is free. add() reports level ups through
+    the on_level_up callback; reset() (loading a save, new game) never does.
+    """
+
+    def __init__(self, requirements, default_requirement, on_level_up=None):
+        self.requirements = requirements  # level -> XP needed to reach the next level
+        self.default_requirement = default_requirement  # For levels past the table
+        self.on_level_up = on_level_up
+
+        # thresholds[i] is the total XP needed to reach level i + 2
+        self.thresholds = []
+        total = 0
+        level = 1
+        while level in requirements:
+            total += requirements[level]
+            self.thresholds.append(total)
+            level += 1
+        self.reset(0)
+
+    def required(self, level):
+        return self.requirements.get(level, self.default_requirement)
+
+    def reset(self, xp):
+        self.xp = xp
+        self.recalculate()
+
+    def add(self, xp):
+        old_level = self.level
+        self.xp += xp
+        self.recalculate()
+        if self.level > old_level and self.on_level_up:
+            self.on_level_up()
+
+    def recalculate(self):
+        table_total = self.thresholds[-1] if self.thresholds else 0
+        if self.xp < table_total:
+            index = bisect_right(self.thresholds, self.xp)
+            level_start = self.thresholds[index - 1] if index else 0
+            self.level = index + 1
+        else:
+            # Past the table every level costs the same
+            extra_levels = (self.xp - table_total) // self.default_requirement
+            level_start = table_total + extra_levels * self.default_requirement
+            self.level = len(self.thresholds) + 1 + int(extra_levels)
+        self.xp_in_level = self.xp - level_start
+        self.xp_required = self.required(self.level)
+        self.progress = self.xp_in_level / self.xp_required
+
+
+class ShapeRegistry:
+    """Direct handles to the gameplay shapes, grouped by role.
+
+    Each role has a material (friction, collision_type, ...). New shapes pick it up
+    when registered, and set_material only touches shapes when a value actually
+    changes, so nothing has to walk space.shapes every tick.
+    """
+
+    def __init__(self):
+        self.shapes = {}     # role -> list of shapes
+        self.materials = {}  # role -> {property: value}
+
+    def add(self, role, shape):
+        self.shapes.setdefault(role, []).append(shape)
+        for name, value in self.materials.get(role, {}).items():
+            setattr(shape, name, value)
+        return shape
+
+    def remove(self, role, shape):
+        self.shapes[role].remove(shape)
+
+    def get(self, role):
+        return self.shapes.get(role, [])
+
+    def set_material(self, role, **properties):
+        material = self.materials.setdefault(role, {})
+        changed = {name: value for name, value in properties.items() if material.get(name) != value}
+        if not changed:
+            return
+        material.update(changed)
+        for shape in self.shapes.get(role, []):
+            for name, value in changed.items():
+                setattr(shape, name, value)
+
+
+class Simulation:
+    """Headless game core: physics space, Sisyphus, boulders, hill rewards and progression.
+
+    Nothing in here touches the display or the mixer, so it can be stepped as fast
+    as the CPU allows. The windowed Game subclasses it and overrides the on_* hooks
+    (and jump/level_up) to add sounds, particles and UI updates on top.
+    """
+
+    def __init__(self, saved_data=None, world=None):
+        if saved_data is None:
+            saved_data = {}
+
+        # Level layout: hills, reward zones, spawn points and decorations
+        self.world = world if world is not None else load_world()
+        self.width = self.world.width
+        self.height = self.world.height
+        self.offset = self.height - self.world.ground_y  # Ground is raised by this many pixels
+
+        # Handles to every gameplay shape; collision types never change, friction follows self.friction
+        self.shape_registry = ShapeRegistry()
+        self.shape_registry.set_material('sisyphus', collision_type=1)
+        self.shape_registry.set_material('terrain', collision_type=2)  # Ground and hills
+        self.shape_registry.set_material('wall', collision_type=2)
+        self.shape_registry.set_material('boulder', collision_type=3)
+        self.shape_registry.set_material('hill_top', collision_type=5, sensor=True)  # Reward zones
+        self.shape_registry.set_material('valley', collision_type=6, sensor=True)    # "At bottom" zones
+        self.friction = 0.6
+        self.dt = 1/60.0  # Fixed simulation tick, independent of the render rate
+
+        self.space = pymunk.Space()
+        self.space.gravity = (0, 900)
+        # **Set collision_slop to zero to prevent penetration**
+        self.space.collision_slop = 0.0
+
+        # Fixed XP requirements per level
+        self.xp_requirements = {
+            1: 5,    # Level 1->2: 10 XP
+            2: 20,    # Level 2->3: 20 XP
+            3: 50,    # Level 3->4: 50 XP
+            4: 100,   # Level 4->5: 100 XP
+            5: 200,   # And so on...
+            6: 500,
+            7: 1000,
+            8: 2000,
+        }
+        # Default to 5000 XP for very high levels
+        self.progression = Progression(self.xp_requirements, 5000, on_level_up=self.level_up)
+
+        # Base push and jump, plus what every level past the first adds
+        self.base_strength = 36
+        self.strength_per_level = 20
+        self.base_jump_force = 3000
+        self.jump_force_per_level = 200
+
+        # Set default values that were previously in sliders
+        self.jump_force = self.base_jump_force
+        self.strength = self.base_strength
+        self.strength_xp = 0  # Start with 0 XP
+
+        # Define reward mapping
+        self.boulder_rewards = {
+            40: (1, 1),    # (money, xp) for small boulder
+            50: (2, 2),    # medium boulder
+            80: (5, 5),    # large boulder
+            120: (20, 20), # huge boulder
+            150: (50, 50)  # golden boulder
+        }
+        # One-time unlock costs for the bigger boulders
+        self.unlock_costs = {50: 10, 80: 50, 120: 200, 150: 1000}
+
+        self.sisyphus = self.create_sisyphus()
+        self.current_boulder = None
+        self.crushing_boulders = []
+        self.boulder_pile = []  # Extra boulders in many-boulder mode
+        self.boulders = {}      # Shape -> boulder dict, for every boulder in the space
+        self.ground = self.create_ground_poly()  # Use the new ground creation method
+        self.walls = self.create_walls()
+        self.hill = self.create_hill()
+        self.create_hill_zones()
+
+        self.recorder = None  # InputRecorder logging every tick's input and action, see replay.py
+        self.jump_cooldown = 0  # Counted in simulation ticks
+        self.is_grounded = False  # Track if player is touching ground
+
+        # Add counter for hill passes and money
+        self.hill_passes = 0
+        self.money = 0  # Start with 0 money
+        self.last_boulder_detected = False  # Whether the player's boulder is on a hill top
+        self.pending_hill_passes = []  # (boulder, zone) pairs reported by the sensors, paid out next tick
+
+        # Add boulder spawn cooldown
+        self.spawn_cooldown = 0
+
+        # Body positions and angles before the latest tick, used to interpolate rendering
+        self.previous_states = {}
+
+        # **Add Collision Handlers to Ignore Specific Collisions**
+        # Crushing Boulders (4) vs Player (1) - Ignore
+        handler_crushing_player = self.space.add_collision_handler(4, 1)
+        handler_crushing_player.begin = self.ignore_collision
+
+        # Crushing Boulders (4) vs Normal Boulders (3) - Ignore
+        handler_crushing_boulders = self.space.add_collision_handler(4, 3)
+        handler_crushing_boulders.begin = self.ignore_collision
+
+        # Crushing Boulders (4) vs Crushing Boulders (4) - Ignore
+        handler_crushing_crushing = self.space.add_collision_handler(4, 4)
+        handler_crushing_crushing.begin = self.ignore_collision
+
+        # Normal Boulders (3) vs Hill Top (5) and Valley (6) sensors - track zone enter/exit
+        for zone_type in (5, 6):
+            handler_zone = self.space.add_collision_handler(3, zone_type)
+            handler_zone.begin = self.boulder_enter_zone
+            handler_zone.separate = self.boulder_exit_zone
+
+        # Initialize values with saved data or defaults
+        self.money = saved_data.get('money', 0)
+        self.strength_xp = saved_data.get('strength_xp', 0)
+
+        # Calculate initial strength based on loaded XP
+        self.apply_level_bonus()
+
+        # Properly merge saved unlocked sizes with defaults
+        self.unlocked_sizes = {
+            40: True,   # Small boulder always unlocked
+            50: False,  # Medium boulder starts locked
+            80: False,  # Large boulder
+            120: False, # Huge boulder starts locked
+            150: False  # Golden boulder starts locked
+        }
+        if 'unlocked_sizes' in saved_data:
+            # JSON saves carry the sizes as string keys
+            self.unlocked_sizes.update({int(size): unlocked for size, unlocked in saved_data['unlocked_sizes'].items()})
+
+        # Instead of spawning default boulder, spawn the last used boulder size
+        last_boulder_size = saved_data.get('last_boulder_size', 40)  # Default to 40 if not found or None
+        if last_boulder_size is None:  # Additional check to ensure we always have a valid size
+            last_boulder_size = 40
+
+        # Get the correct rewards for the loaded boulder size
+        self.boulder_reward, self.boulder_xp_gain = self.boulder_rewards[last_boulder_size]
+        self.spawn_boulder(last_boulder_size, self.boulder_reward, self.boulder_xp_gain)
+
+    # Hooks for the presentation layer, no-ops when running headless
+    def on_hill_pass(self, amount, label_position):
+        pass
+
+    def on_unlock(self, size):
+        pass
+
+    def ignore_collision(self, arbiter, space, data):
+        """Collision handler that ignores the collision."""
+        return False  # Returning False tells Pymunk to ignore the collision
+
+    def boulder_enter_zone(self, arbiter, space, data):
+        boulder_shape, zone = arbiter.shapes
+        boulder = self.boulders.get(boulder_shape)
+        if boulder is None or boulder['state'] != 'normal':
+            return True
+        boulder['zones'].add(zone)
+        if zone.zone_type == 'valley':
+            boulder['at_bottom'] = True
+        elif boulder['at_bottom']:
+            # Pushed up from a valley onto a hill top; rewards are paid outside the physics step
+            self.pending_hill_passes.append((boulder, zone))
+            boulder['at_bottom'] = any(z.zone_type == 'valley' for z in boulder['zones'])
+        return True
+
+    def boulder_exit_zone(self, arbiter, space, data):
+        boulder_shape, zone = arbiter.shapes
+        boulder = self.boulders.get(boulder_shape)
+        if boulder is not None:
+            boulder['zones'].discard(zone)
+
+    @property
+    def friction(self):
+        return self._friction
+
+    @friction.setter
+    def friction(self, friction):
+        # Everything in the world slides with 80% of the base friction
+        self._friction = friction
+        for role in ('sisyphus', 'terrain', 'wall', 'boulder'):
+            self.shape_registry.set_material(role, friction=friction * 0.8)
+
+    @property
+    def strength_xp(self):
+        return self.progression.xp
+
+    @strength_xp.setter
+    def strength_xp(self, xp):
+        # Setting XP directly (loading, resetting) never counts as a level up
+        self.progression.reset(xp)
+
+    def calculate_xp_required(self, level):
+        return self.progression.required(level)
+
+    def calculate_strength_level(self):
+        return self.progression.level
+
+    def calculate_xp_progress(self):
+        return self.progression.progress
+
+    def apply_level_bonus(self):
+        current_level = self.calculate_strength_level()
+        self.strength = self.base_strength + (current_level - 1) * self.strength_per_level
+        self.jump_force = self.base_jump_force + (current_level - 1) * self.jump_force_per_level
+
+    def level_up(self):
+        # Apply level up effects
+        self.apply_level_bonus()
+
+    def create_walls(self):
+        walls = []
+        wall_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        wall_thickness = 5
+
+        # Add the wall body to the space first
+        self.space.add(wall_body)
+
+        # Left wall
+        left_wall_shape = pymunk.Segment(wall_body, (0, 0), (0, self.height), wall_thickness)
+        # Right wall - ensure it's at exactly self.width
+        right_wall_shape = pymunk.Segment(wall_body, (self.width, 0), (self.width, self.height), wall_thickness)
+        # Top wall
+        top_wall_shape = pymunk.Segment(wall_body, (0, 0), (self.width, 0), wall_thickness)
+
+        for wall in [left_wall_shape, right_wall_shape, top_wall_shape]:
+            self.shape_registry.add('wall', wall)
+            self.space.add(wall)
+            walls.append(wall)
+
+        return walls
+
+    def create_ground_poly(self):
+        # Create a ground as a static polygon with thickness
+        ground_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        ground_shape = pymunk.Poly(ground_body, [
+            (0, self.height - self.offset),  # Raise by offset
+            (self.width, self.height - self.offset),  # Extend to new width
+            (self.width, self.height - self.offset - 10),  # Extend to new width
+            (0, self.height - self.offset - 10)  # Raise by offset
+        ])
+        self.shape_registry.add('terrain', ground_shape)
+        ground_shape.color = pygame.Color(139, 69, 19)  # Change ground color to match mountain fill color
+        self.space.add(ground_body, ground_shape)
+        return ground_body
+
+    def create_sisyphus(self):
+        sisyphus_size = 50
+        sisyphus_mass = 10
+        sisyphus_moment = pymunk.moment_for_box(sisyphus_mass, (sisyphus_size, sisyphus_size))
+        sisyphus_body = pymunk.Body(sisyphus_mass, sisyphus_moment)
+        sisyphus_body.position = 400, self.height - sisyphus_size/2 - self.offset  # Raise by offset
+        sisyphus_shape = pymunk.Poly.create_box(sisyphus_body, (sisyphus_size, sisyphus_size))
+        self.shape_registry.add('sisyphus', sisyphus_shape)
+        self.sisyphus_shape = sisyphus_shape
+        self.sisyphus_size = sisyphus_size
+        sisyphus_shape.color = pygame.Color('red')  # Change color to red
+
+        # Add collision handler to detect ground contact
+        def begin_collision(arbiter, space, data):
+            self.is_grounded = True
+            return True
+
+        def separate_collision(arbiter, space, data):
+            self.is_grounded = False
+            return True
+
+        handler = self.space.add_collision_handler(1, 2)  # 1 for sisyphus, 2 for ground/platforms
+        handler.begin = begin_collision
+        handler.separate = separate_collision
+
+        self.space.add(sisyphus_body, sisyphus_shape)
+        return sisyphus_body
+
+    def create_boulder(self, radius=40, position=(480, 0)):
+        boulder_mass = radius * 0.5
+        boulder_moment = pymunk.moment_for_circle(boulder_mass, 0, radius)
+        boulder_body = pymunk.Body(boulder_mass, boulder_moment)
+
+        # Use the provided position for spawning
+        boulder_body.position = position
+        boulder_shape = pymunk.Circle(boulder_body, radius)
+        self.shape_registry.add('boulder', boulder_shape)
+        boulder_shape.color = pygame.Color('gray')  # Set default color
+        self.space.add(boulder_body, boulder_shape)
+        return boulder_body, boulder_shape
+
+    def create_hill(self):
+        # Terrain polylines from the world file, one static segment per edge
+        hill_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        hill_shapes = [self.shape_registry.add('terrain', segment)
+                       for segment in self.world.create_terrain_shapes(hill_body)]
+        self.space.add(hill_body, *hill_shapes)
+        return hill_body
+
+    def create_hill_zones(self):
+        # Hill tops count a boulder as over the top; valleys mark it as back at the bottom
+        zones = [self.shape_registry.add(zone.zone_type, zone)
+                 for zone in self.world.create_zone_shapes(self.space.static_body)]
+        self.space.add(*zones)
+
+    def unlock_and_spawn(self, size):
+        if not self.unlocked_sizes[size] and self.money >= self.unlock_costs[size]:
+            self.money -= self.unlock_costs[size]
+            self.unlocked_sizes[size] = True
+            self.on_unlock(size)
+
+        if self.unlocked_sizes[size]:
+            reward, xp_gain = self.boulder_rewards.get(size, (1, 1))  # Default to (1$, 1 XP) if not found
+            self.spawn_boulder(size, reward, xp_gain)
+
+    def spawn_boulder(self, size=40, reward=None, xp_gain=None):
+        # Check cooldown
+        if self.spawn_cooldown > 0:
+            return
+
+        # Only check unlocks, no cost per spawn
+        if not self.unlocked_sizes[size]:
+            return
+
+        if self.current_boulder is not None:
+            self.remove_boulder(self.current_boulder)
+            self.current_boulder = None
+
+        # Get rewards from mapping if not specified
+        if reward is None or xp_gain is None:
+            reward, xp_gain = self.boulder_rewards[size]  # Changed from .get() to direct access
+
+        # Spawn in front of the next hill Sisyphus hasn't passed yet
+        boulder_position = self.world.spawn_position(self.sisyphus.position.x)
+
+        self.current_boulder = self.add_boulder(size, boulder_position, reward)
+        self.boulder_reward = reward
+        self.boulder_xp_gain = xp_gain
+
+        # Set spawn cooldown
+        self.spawn_cooldown = 10
+
+    def add_boulder(self, size, position, reward):
+        boulder_body, boulder_shape = self.create_boulder(size, position)
+        boulder = {
+            'body': boulder_body,
+            'shape': boulder_shape,
+            'state': 'normal',
+            'reward': reward,
+            'zones': set(),      # Sensor zones it overlaps, kept up to date by the handlers
+            'at_bottom': False,  # Has been in a valley since its last payout
+        }
+        self.boulders[boulder_shape] = boulder
+        return boulder
+
+    def remove_boulder(self, boulder):
+        self.space.remove(boulder['body'], boulder['shape'])
+        self.shape_registry.remove('boulder', boulder['shape'])
+        del self.boulders[boulder['shape']]
+
+    def spawn_boulder_pile(self, count, sizes=(40,), spatial_hash=True):
+        """Many-boulder mode: drop `count` extra boulders in rows across the whole world.
+
+        They can be pushed over the hills for the usual rewards. The space switches to
+        a spatial hash with cells about one boulder across, which keeps broadphase
+        cost flat as the pile grows instead of rebalancing a bounding box tree.
+        """
+        radii = [size for size in sizes if size in self.boulder_rewards]
+        if not radii:
+            raise ValueError(f"sizes must come from boulder_rewards {list(self.boulder_rewards)}")
+        if spatial_hash:
+            self.space.use_spatial_hash(2 * sum(radii) / len(radii), max(1000, 10 * (count + len(self.boulders))))
+
+        slots = self.pile_slots(max(radii))
+        if count > len(slots):
+            raise ValueError(f"{count} boulders don't fit in a {self.width}px wide world (max {len(slots)})")
+        for i, position in enumerate(slots[:count]):
+            size = radii[i % len(radii)]
+            self.boulder_pile.append(self.add_boulder(size, position, self.boulder_rewards[size][0]))
+
+    def pile_slots(self, radius, gap=4):
+        """Centres for a boulder pile, top row first, leaving out any slot in or under the terrain."""
+        # Rows from the top down, each boulder one diameter plus a gap from the last
+        spacing = 2 * radius + gap
+        columns = int((self.width - spacing) // spacing)
+        rows = int((self.world.ground_y - 150) // spacing)  # Leave room above the ground for Sisyphus
+        terrain = self.shape_registry.get('terrain')
+        slots = []
+        for row in range(rows):
+            for column in range(columns):
+                x, y = spacing * (column + 1), spacing * (row + 0.5) + 5
+                # Touching a surface, or with one above it (inside a hill), the boulder would be stuck
+                if not any(shape.point_query((x, y)).distance < radius + gap or
+                           shape.segment_query((x, y), (x, 0)).shape is not None
+                           for shape in terrain):
+                    slots.append((x, y))
+        return slots
+
+    def clear_boulders(self):
+        if self.current_boulder:
+            self.remove_boulder(self.current_boulder)
+            self.current_boulder = None
+        for boulder in self.crushing_boulders + self.boulder_pile:
+            self.remove_boulder(boulder)
+        self.crushing_boulders.clear()
+        self.boulder_pile.clear()
+
+    def reset_progress(self):
+        # Back to a fresh save: no money, no XP, only the small boulder
+        self.money = 0
+        self.strength_xp = 0
+        self.strength = self.base_strength
+        self.jump_force = self.base_jump_force
+        self.unlocked_sizes = {
+            40: True,   # Small boulder always unlocked
+            50: False,  # Medium boulder starts locked
+            80: False,  # Large boulder
+            120: False, # Huge boulder starts locked
+            150: False  # Golden boulder starts locked
+        }
+
+    def try_jump(self):
+        # Jump only when grounded and the cooldown has run out
+        if self.jump_cooldown <= 0 and self.is_grounded:
+            self.jump()
+            self.jump_cooldown = 30  # Set cooldown after jumping
+            self.is_grounded = False  # Immediately set grounded to false when jumping
+
+    def jump(self):
+        # Apply jump force in world coordinates (always upwards)
+        jump_force = (0, -self.jump_force)
+        self.sisyphus.apply_impulse_at_world_point(jump_force, self.sisyphus.position)
+
+    def resize_sisyphus(self, size):
+        self.space.remove(self.sisyphus_shape)
+        self.shape_registry.remove('sisyphus', self.sisyphus_shape)
+        new_shape = pymunk.Poly.create_box(self.sisyphus, (size, size))
+        new_shape.color = self.sisyphus_shape.color
+        self.shape_registry.add('sisyphus', new_shape)  # Friction and collision type for resized sisyphus
+        self.space.add(new_shape)
+        self.sisyphus_shape = new_shape
+        self.sisyphus_size = size
+
+    def move_sisyphus(self, left, right):
+        base_move_force = 100  # Base movement force
+        strength = self.strength
+        # Scale sisyphus based on strength directly
+        target_size = 40 + (self.calculate_strength_level() - 1) * 5  # Adjust size progression
+        if abs(self.sisyphus_size - target_size) > 1:
+            self.resize_sisyphus(target_size)
+
+        if left:
+            move_force = -base_move_force
+            # Apply additional force based on strength when pushing boulders
+            if self.current_boulder and self.current_boulder['state'] == 'normal':
+                boulder = self.current_boulder['body']
+                if self.sisyphus.position.x > boulder.position.x:
+                    move_force -= strength
+            self.sisyphus.apply_impulse_at_world_point((move_force, 0), self.sisyphus.position)
+        if right:
+            move_force = base_move_force
+            # Apply additional force based on strength when pushing boulders
+            if self.current_boulder and self.current_boulder['state'] == 'normal':
+                boulder = self.current_boulder['body']
+                if self.sisyphus.position.x < boulder.position.x:
+                    move_force += strength
+            self.sisyphus.apply_impulse_at_world_point((move_force, 0), self.sisyphus.position)
+
+    def step(self):
+        # Update crushing boulders
+        for boulder in self.crushing_boulders[:]:  # Iterate over a copy
+            boulder['timer'] -= 1
+            if boulder['timer'] <= 0:
+                # Remove boulder from space and from list
+                self.remove_boulder(boulder)
+                self.crushing_boulders.remove(boulder)
+
+        self.update_hill_rewards()
+
+        # Update jump cooldown
+        if self.jump_cooldown > 0:
+            self.jump_cooldown -= 1
+
+        # Update spawn cooldown
+        if self.spawn_cooldown > 0:
+            self.spawn_cooldown -= 1
+
+        # Remember where things were so the renderer can interpolate between ticks
+        self.previous_states = {body: (body.position, body.angle) for body in self.interpolated_bodies()}
+
+        # Step the physics simulation
+        self.space.step(self.dt)
+
+    def capture_snapshot(self, camera_x=0.0):
+        """Pack the live physics state into a SNAPSHOT record, the same size however long the session."""
+        boulder = self.current_boulder
+        if boulder is not None:
+            boulder_fields = (True, boulder['shape'].radius, *body_state(boulder['body']),
+                              boulder['reward'], self.boulder_xp_gain, boulder['at_bottom'])
+        else:
+            boulder_fields = (False, 0.0) + (0.0,) * 6 + (0, 0, False)
+        return SNAPSHOT.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+            *body_state(self.sisyphus), self.sisyphus_size,
+            self.jump_cooldown, self.spawn_cooldown, self.is_grounded,
+            camera_x,
+            *boulder_fields,
+        )
+
+    def restore_snapshot(self, data):
+        """Put Sisyphus and the current boulder back as captured; returns the saved camera x."""
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise ValueError("snapshot is truncated")
+        magic, version = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or len(data) != SNAPSHOT.size:
+            raise ValueError(f"unsupported snapshot (version {version})")
+        fields = SNAPSHOT.unpack(data)[2:]
+        sisyphus_state, sisyphus_size = fields[0:6], fields[6]
+        self.jump_cooldown, self.spawn_cooldown, self.is_grounded, camera_x = fields[7:11]
+        has_boulder, radius, boulder_state = fields[11], int(fields[12]), fields[13:19]
+        reward, xp_gain, at_bottom = fields[19:22]
+
+        if sisyphus_size != self.sisyphus_size:
+            self.resize_sisyphus(sisyphus_size)
+        set_body_state(self.sisyphus, sisyphus_state)
+        self.space.reindex_shapes_for_body(self.sisyphus)
+
+        # Reuse the boulder spawned from the save if it is the right size, otherwise swap it
+        boulder = self.current_boulder
+        if boulder is not None and (not has_boulder or boulder['shape'].radius != radius):
+            self.remove_boulder(boulder)
+            self.current_boulder = boulder = None
+        if has_boulder:
+            if boulder is None:
+                self.current_boulder = boulder = self.add_boulder(radius, boulder_state[0:2], reward)
+            set_body_state(boulder['body'], boulder_state)
+            self.space.reindex_shapes_for_body(boulder['body'])
+            boulder['reward'] = reward
+            boulder['at_bottom'] = at_bottom
+            self.boulder_reward = reward
+            self.boulder_xp_gain = xp_gain
+
+        self.previous_states = {}  # Nothing to interpolate from yet
+        return camera_x
+
+    def interpolated_bodies(self):
+        # Bodies whose previous state step() records; the game narrows this to what's near the camera
+        return [body for body in self.space.bodies if body.body_type == pymunk.Body.DYNAMIC]
+
+    def perform(self, action, size=40):
+        # Every button that changes the simulation goes through here so it can be recorded
+        if self.recorder is not None:
+            self.recorder.record_action(action, size)
+        if action == ACTION_SPAWN:
+            self.spawn_boulder(size, 1)
+        elif action == ACTION_UNLOCK_AND_SPAWN:
+            self.unlock_and_spawn(size)
+        elif action == ACTION_NEW_GAME:
+            self.reset_progress()
+            self.clear_boulders()
+            self.spawn_boulder(40, 1, 1)
+        else:
+            raise ValueError(f"unknown action {action}")
+
+    def tick(self, left=False, right=False, jump=False):
+        # One full frame of input plus simulation, in the same order the game loop uses
+        if self.recorder is not None:
+            self.recorder.record_input(left, right, jump)
+        if jump:
+            self.try_jump()
+        self.move_sisyphus(left, right)
+        self.step()
+
+    def update_hill_rewards(self):
+        # Pay out the hill passes the sensor handlers reported during the last step
+        for boulder, zone in self.pending_hill_passes:
+            if boulder['shape'] not in self.boulders:
+                continue  # Replaced or cleared since
+            reward = zone.reward_multiplier * boulder['reward']
+            self.hill_passes += 1
+            self.money += reward
+
+            # Let the game spawn money particles above the correct hill
+            self.on_hill_pass(reward, zone.label_position)
+
+            # XP by boulder size, from the same table as the money reward
+            xp_gain = self.boulder_rewards.get(boulder['shape'].radius, (1, 1))[1]
+
+            # Calls level_up if this crosses into a new level
+            self.progression.add(xp_gain)
+        self.pending_hill_passes.clear()
+
+        # The hill lights up while the player's own boulder sits on a top
+        boulder = self.current_boulder
+        self.last_boulder_detected = bool(
+            boulder and boulder['state'] == 'normal' and
+            any(zone.zone_type == 'hill_top' for zone in boulder['zones'])
+        )
+
+if __name__ == "__main__":
+    # Quick throughput check: hold right and jump whenever possible
+    sim = Simulation()
+    ticks = 10000
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.tick(right=True, jump=True)
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/s)")
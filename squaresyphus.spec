@@ -1,7 +1,16 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+import sys
+
 block_cipher = None
 
+# Pre-decode and scale the sprites and sound effects into one memory-mapped bundle,
+# so the exe starts without decoding any PNG or MP3 (see bundle.py)
+sys.path.insert(0, SPECPATH)
+from bundle import build_bundle, BUNDLE_PATH
+build_bundle()
+
 a = Analysis(
     ['main.py'],
     pathex=[],
@@ -22,6 +31,8 @@ a = Analysis(
         ('assets/splash.png', 'assets'),
         ('assets/Endless-Journey.mp3', 'assets'),
         ('assets/Endless-Ascent.mp3', 'assets'),
+        ('worlds/default.json', 'worlds'),
+        (os.path.relpath(BUNDLE_PATH, SPECPATH), 'assets'),
     ],
     hiddenimports=['pymunk.pygame_util'],
     hookspath=[],
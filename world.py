@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+import time
+
+import pygame
+import pymunk
+
+
+WORLDS_DIR = os.path.join(os.path.dirname(__file__), 'worlds')
+DEFAULT_WORLD = os.path.join(WORLDS_DIR, 'default.json')
+
+ZONE_TYPES = ('hill_top', 'valley')
+
+
+class World:
+    """A level loaded from a world file: terrain, reward zones, spawn points and decorations.
+
+    Everything is validated and converted to tuples once at load time, so building
+    the static physics bodies and the render layers later is a straight copy.
+    Coordinates are world pixels with y pointing down, like the rest of the game.
+    """
+
+    def __init__(self, data, path='<world>'):
+        self.path = path
+        self.data = data  # As loaded, so an input log can carry the world it was recorded in
+        self.load_time = 0.0
+
+        self.width = require_number(data, 'width', path, minimum=800)  # At least one screen wide
+        self.height = require_number(data, 'height', path, minimum=1)
+        self.ground_y = require_number(data, 'ground_y', path, minimum=0, maximum=self.height)
+
+        # Terrain polylines, kept as tuples for both pymunk segments and pygame polygons
+        self.terrain = []
+        for i, entry in enumerate(require_list(data, 'terrain', path)):
+            where = f"{path}: terrain[{i}]"
+            points = [self.require_point(point, where) for point in require_list(entry, 'points', where)]
+            if len(points) < 2:
+                raise ValueError(f"{where}: needs at least 2 points")
+            self.terrain.append({
+                'name': entry.get('name', f"terrain {i}"),
+                'points': points,
+                'color': tuple(entry.get('color', (139, 69, 19))),
+            })
+
+        self.zones = []
+        for i, entry in enumerate(require_list(data, 'zones', path)):
+            where = f"{path}: zones[{i}]"
+            zone_type = entry.get('type')
+            if zone_type not in ZONE_TYPES:
+                raise ValueError(f"{where}: type must be one of {', '.join(ZONE_TYPES)}, got {zone_type!r}")
+            rect = entry.get('rect')
+            if not (isinstance(rect, list) and len(rect) == 4 and all(is_number(v) for v in rect)):
+                raise ValueError(f"{where}: rect must be [x, y, width, height]")
+            x, y, w, h = rect
+            if w <= 0 or h <= 0:
+                raise ValueError(f"{where}: rect must have a positive size")
+            self.require_point((x, y), where)
+            self.require_point((x + w, y + h), where)
+            zone = {'type': zone_type, 'rect': (x, y, w, h)}
+            if zone_type == 'hill_top':
+                zone['reward_multiplier'] = require_number(entry, 'reward_multiplier', where, minimum=0)
+                zone['label'] = self.require_point(entry.get('label', (x + w / 2, y)), where)
+            self.zones.append(zone)
+        if not any(zone['type'] == 'hill_top' for zone in self.zones):
+            raise ValueError(f"{path}: needs at least one hill_top zone")
+
+        # Spawn points are checked in order; the first whose before_x is past the player wins
+        self.spawn_points = []
+        spawn_entries = require_list(data, 'spawn_points', path)
+        for i, entry in enumerate(spawn_entries):
+            where = f"{path}: spawn_points[{i}]"
+            before_x = entry.get('before_x')
+            if before_x is None and i != len(spawn_entries) - 1:
+                raise ValueError(f"{where}: only the last spawn point may omit before_x")
+            if before_x is not None and not is_number(before_x):
+                raise ValueError(f"{where}: before_x must be a number")
+            self.spawn_points.append((before_x, self.require_point(entry.get('position'), where)))
+        if not self.spawn_points or self.spawn_points[-1][0] is not None:
+            raise ValueError(f"{path}: the last spawn point must omit before_x so every position has one")
+
+        self.decorations = []
+        for i, entry in enumerate(data.get('decorations', [])):
+            where = f"{path}: decorations[{i}]"
+            if not isinstance(entry.get('image'), str):
+                raise ValueError(f"{where}: image must be a file name in assets/")
+            self.decorations.append({
+                'image': entry['image'],
+                'position': self.require_point(entry.get('position'), where),
+                'scale': require_number(entry, 'scale', where, minimum=0, default=1),
+            })
+
+    def require_point(self, point, where):
+        if not (isinstance(point, (list, tuple)) and len(point) == 2 and all(is_number(v) for v in point)):
+            raise ValueError(f"{where}: expected an [x, y] point, got {point!r}")
+        x, y = point
+        if not (0 <= x <= self.width and 0 <= y <= self.height):
+            raise ValueError(f"{where}: point ({x}, {y}) is outside the {self.width}x{self.height} world")
+        return (x, y)
+
+    def spawn_position(self, player_x):
+        for before_x, position in self.spawn_points:
+            if before_x is None or player_x < before_x:
+                return position
+
+    def create_terrain_shapes(self, body, radius=5):
+        # One segment per polyline edge
+        shapes = []
+        for terrain in self.terrain:
+            points = terrain['points']
+            for a, b in zip(points, points[1:]):
+                segment = pymunk.Segment(body, a, b, radius)
+                segment.color = pygame.Color(*terrain['color'])
+                shapes.append(segment)
+        return shapes
+
+    def create_zone_shapes(self, body):
+        # Sensor boxes; hill tops carry their reward multiplier and money label position
+        shapes = []
+        for zone in self.zones:
+            x, y, w, h = zone['rect']
+            shape = pymunk.Poly(body, [(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+            shape.zone_type = zone['type']
+            shape.reward_multiplier = zone.get('reward_multiplier', 0)
+            shape.label_position = zone.get('label')
+            shapes.append(shape)
+        return shapes
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def require_list(data, key, where):
+    value = data.get(key)
+    if not isinstance(value, list):
+        raise ValueError(f"{where}: {key} must be a list")
+    return value
+
+
+def require_number(data, key, where, minimum=None, maximum=None, default=None):
+    value = data.get(key, default)
+    if not is_number(value):
+        raise ValueError(f"{where}: {key} must be a number, got {value!r}")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise ValueError(f"{where}: {key}={value} is out of range")
+    return value
+
+
+def load_world(path=DEFAULT_WORLD):
+    """Read, validate and precompute a world file. Raises ValueError on a bad file."""
+    start = time.perf_counter()
+    with open(path, 'r') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from e
+    if data.get('version') != 1:
+        raise ValueError(f"{path}: unsupported world version {data.get('version')!r}")
+    world = World(data, path)
+    world.load_time = time.perf_counter() - start
+    return world
+
+
+if __name__ == "__main__":
+    # Validate world files and report how long each takes to load
+    for world_path in sys.argv[1:] or [DEFAULT_WORLD]:
+        try:
+            world = load_world(world_path)
+        except (OSError, ValueError) as e:
+            print(f"Invalid world: {e}")
+            sys.exit(1)
+        print(f"{world_path}: {len(world.terrain)} terrain, {len(world.zones)} zones, "
+              f"{len(world.spawn_points)} spawns, {len(world.decorations)} decorations, "
+              f"{world.width}x{world.height}, loaded in {world.load_time * 1000:.2f} ms")